@@ -0,0 +1,48 @@
+"""add_webhook_events_table
+
+Revision ID: a7c2e9f41b85
+Revises: f3b8d1e6a4c7
+Create Date: 2026-10-18 11:40:52.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c2e9f41b85'
+down_revision: Union[str, None] = 'f3b8d1e6a4c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('webhook_events',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('webhook_url', sa.String(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('secret', sa.String(), nullable=True),
+    sa.Column('delivered', sa.Boolean(), nullable=False),
+    sa.Column('delivery_attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('response_code', sa.Integer(), nullable=True),
+    sa.Column('response_body', sa.Text(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_attempt_at', sa.DateTime(), nullable=True),
+    sa.Column('delivered_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_webhook_events_user_created', 'webhook_events', ['user_id', 'created_at'], unique=False)
+    op.create_index('idx_webhook_events_delivered', 'webhook_events', ['delivered'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_webhook_events_delivered', table_name='webhook_events')
+    op.drop_index('idx_webhook_events_user_created', table_name='webhook_events')
+    op.drop_table('webhook_events')
@@ -0,0 +1,49 @@
+"""webhook_events_payload_json
+
+Revision ID: b4d9e2c7f183
+Revises: a7c2e9f41b85
+Create Date: 2026-10-18 14:05:12.604317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d9e2c7f183'
+down_revision: Union[str, None] = 'a7c2e9f41b85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('webhook_events', 'payload',
+                   existing_type=sa.Text(),
+                   type_=postgresql.JSONB(),
+                   existing_nullable=False,
+                   postgresql_using='payload::jsonb')
+    else:
+        with op.batch_alter_table('webhook_events') as batch_op:
+            batch_op.alter_column('payload',
+                   existing_type=sa.Text(),
+                   type_=sa.JSON(),
+                   existing_nullable=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('webhook_events', 'payload',
+                   existing_type=postgresql.JSONB(),
+                   type_=sa.Text(),
+                   existing_nullable=False,
+                   postgresql_using='payload::text')
+    else:
+        with op.batch_alter_table('webhook_events') as batch_op:
+            batch_op.alter_column('payload',
+                   existing_type=sa.JSON(),
+                   type_=sa.Text(),
+                   existing_nullable=False)
@@ -0,0 +1,43 @@
+"""api_key_hash_binary
+
+Revision ID: d2a6f4c8e915
+Revises: b4d9e2c7f183
+Create Date: 2026-10-18 18:41:52.306117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6f4c8e915'
+down_revision: Union[str, None] = 'b4d9e2c7f183'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # New keys store the raw 32-byte SHA-256 digest; existing rows keep
+    # their bcrypt hash as bytes and are still verified with bcrypt
+    with op.batch_alter_table('api_keys') as batch_op:
+        batch_op.alter_column(
+            'key_hash',
+            existing_type=sa.String(),
+            type_=sa.LargeBinary(32),
+            existing_nullable=False,
+            postgresql_using="convert_to(key_hash, 'UTF8')"
+        )
+
+
+def downgrade() -> None:
+    # Digest-hashed keys cannot be verified by the old code and stop working
+    with op.batch_alter_table('api_keys') as batch_op:
+        batch_op.alter_column(
+            'key_hash',
+            existing_type=sa.LargeBinary(32),
+            type_=sa.String(),
+            existing_nullable=False,
+            postgresql_using="encode(key_hash, 'escape')"
+        )
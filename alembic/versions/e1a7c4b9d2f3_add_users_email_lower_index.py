@@ -0,0 +1,27 @@
+"""add_users_email_lower_index
+
+Revision ID: e1a7c4b9d2f3
+Revises: 58619256db3c
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a7c4b9d2f3'
+down_revision: Union[str, None] = '58619256db3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Functional unique index so lower(email) lookups hit an index
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users')
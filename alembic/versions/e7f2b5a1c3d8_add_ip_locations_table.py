@@ -0,0 +1,31 @@
+"""add_ip_locations_table
+
+Revision ID: e7f2b5a1c3d8
+Revises: d2a6f4c8e915
+Create Date: 2026-10-19 09:12:37.504218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7f2b5a1c3d8'
+down_revision: Union[str, None] = 'd2a6f4c8e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ip_locations',
+    sa.Column('ip_address', sa.String(), nullable=False),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('ip_address')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ip_locations')
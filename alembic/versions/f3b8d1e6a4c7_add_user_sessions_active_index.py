@@ -0,0 +1,32 @@
+"""add_user_sessions_active_index
+
+Revision ID: f3b8d1e6a4c7
+Revises: e1a7c4b9d2f3
+Create Date: 2026-10-18 10:03:17.582940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d1e6a4c7'
+down_revision: Union[str, None] = 'e1a7c4b9d2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite index for listing a user's active, unexpired sessions by activity
+    op.create_index(
+        'ix_user_sessions_user_active_expires',
+        'user_sessions',
+        ['user_id', 'is_active', 'expires_at', 'last_activity_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_sessions_user_active_expires', table_name='user_sessions')
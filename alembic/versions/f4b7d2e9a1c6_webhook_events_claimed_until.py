@@ -0,0 +1,26 @@
+"""webhook_events_claimed_until
+
+Revision ID: f4b7d2e9a1c6
+Revises: e7f2b5a1c3d8
+Create Date: 2026-10-18 21:17:44.861302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b7d2e9a1c6'
+down_revision: Union[str, None] = 'e7f2b5a1c3d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('webhook_events', sa.Column('claimed_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('webhook_events', 'claimed_until')
@@ -9,8 +9,8 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 import uuid
 import logging
-import os
 
+from ...config_clean import settings
 from ...db import SessionLocal
 from ...models import EmailCampaign, EmailTracker, EmailEvent
 from ...email_schemas import (
@@ -202,53 +202,50 @@ async def get_campaign(
     """
     Get details for a specific campaign including statistics
     """
+    # Only the queries can fail unexpectedly; the 404 below is raised
+    # outside the try so it is not caught and re-raised on the way out
     try:
         campaign = db.query(EmailCampaign).filter(
             EmailCampaign.id == campaign_id
         ).first()
         
-        if not campaign:
-            raise HTTPException(status_code=404, detail="Campaign not found")
-        
         # Get trackers for this campaign
         trackers = db.query(EmailTracker).filter(
             EmailTracker.campaign_id == campaign_id
-        ).all()
-        
-        # Calculate stats
-        total_sent = len(trackers)
-        total_opens = sum(1 for t in trackers if t.opened_at)
-        total_clicks = sum(t.click_count for t in trackers)
-        
-        # Find last sent email
-        last_sent = None
-        for tracker in trackers:
-            if tracker.sent_at:
-                if not last_sent or tracker.sent_at > last_sent:
-                    last_sent = tracker.sent_at
-        
-        # Build response with statistics
-        campaign_dict = {
-            "id": campaign.id,
-            "name": campaign.name,
-            "description": campaign.description,
-            "created_at": campaign.created_at,
-            "updated_at": campaign.updated_at,
-            "total_sent": total_sent,
-            "total_opens": total_opens,
-            "total_clicks": total_clicks,
-            "open_rate": round((total_opens / total_sent * 100) if total_sent > 0 else 0, 2),
-            "click_rate": round((total_clicks / total_sent * 100) if total_sent > 0 else 0, 2),
-            "last_email_sent": last_sent
-        }
-        
-        return campaign_dict
-        
-    except HTTPException:
-        raise
+        ).all() if campaign else []
     except Exception as e:
         logger.error(f"Error getting campaign {campaign_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get campaign: {str(e)}")
+    
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    # Calculate stats
+    total_sent = len(trackers)
+    total_opens = sum(1 for t in trackers if t.opened_at)
+    total_clicks = sum(t.click_count for t in trackers)
+    
+    # Find last sent email
+    last_sent = None
+    for tracker in trackers:
+        if tracker.sent_at:
+            if not last_sent or tracker.sent_at > last_sent:
+                last_sent = tracker.sent_at
+    
+    # Build response with statistics
+    return {
+        "id": campaign.id,
+        "name": campaign.name,
+        "description": campaign.description,
+        "created_at": campaign.created_at,
+        "updated_at": campaign.updated_at,
+        "total_sent": total_sent,
+        "total_opens": total_opens,
+        "total_clicks": total_clicks,
+        "open_rate": round((total_opens / total_sent * 100) if total_sent > 0 else 0, 2),
+        "click_rate": round((total_clicks / total_sent * 100) if total_sent > 0 else 0, 2),
+        "last_email_sent": last_sent
+    }
 
 
 @router.put("/{campaign_id}", response_model=EmailCampaignResponse)
@@ -440,11 +437,11 @@ async def send_campaign(
         
         # Create email tracker
         tracker_id = str(uuid.uuid4())
-        tracking_pixel_url = f"{os.getenv('BASE_URL')}/track/open/{tracker_id}"
+        tracking_pixel_url = f"{settings.base_url}/track/open/{tracker_id}"
         
         # Use company name from environment if not provided
         if not email_request.from_name:
-            email_request.from_name = os.getenv('SENDER_NAME', 'Cold Edge AI')
+            email_request.from_name = settings.sender_name or 'Cold Edge AI'
         
         # Create tracker record
         db_tracker = EmailTracker(
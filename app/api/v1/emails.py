@@ -5,9 +5,9 @@ from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
 from datetime import datetime
 import uuid
-import os
 import logging
 
+from ...config_clean import settings
 from ...db import SessionLocal
 from ...models import EmailTracker, EmailCampaign
 from ...email_schemas import EmailSendRequest, EmailSendResponse, BulkEmailSendRequest
@@ -75,11 +75,11 @@ async def send_single_email(
 
         # Create email tracker
         tracker_id = str(uuid.uuid4())
-        tracking_pixel_url = f"{os.getenv('BASE_URL', 'http://localhost:8001')}/track/open/{tracker_id}"
+        tracking_pixel_url = f"{settings.base_url or 'http://localhost:8001'}/track/open/{tracker_id}"
 
         # Use company name from environment if not provided
         if not email_request.from_name:
-            email_request.from_name = os.getenv('SENDER_NAME', 'EmailTracker')
+            email_request.from_name = settings.sender_name or 'EmailTracker'
 
         # Create tracker record
         db_tracker = EmailTracker(
@@ -175,7 +175,7 @@ async def send_bulk_emails(
             )
             
             tracker_id = str(uuid.uuid4())
-            tracking_pixel_url = f"{os.getenv('BASE_URL', 'http://localhost:8001')}/track/open/{tracker_id}"
+            tracking_pixel_url = f"{settings.base_url or 'http://localhost:8001'}/track/open/{tracker_id}"
             
             db_tracker = EmailTracker(
                 id=tracker_id,
@@ -6,9 +6,8 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
-from ...dependencies import get_db
-from ...auth.jwt_auth import get_current_user_from_jwt
-from ...auth.subscription_auth import require_feature, require_plan
+from ...auth.jwt_auth import get_current_user, get_db
+from ...auth.subscription_auth import create_feature_checker, require_recurring_campaigns
 from ...database.user_models import User
 from ...database.recurring_models import RecurringStatus
 from ...services.recurring_campaign_service import RecurringCampaignService
@@ -30,10 +29,15 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/recurring-campaigns", tags=["Recurring Campaigns"])
 
+require_recurring_campaigns_to_create = create_feature_checker(
+    'recurring_campaigns',
+    error_message="Recurring campaigns require Pro plan or higher. Upgrade to create automated email sequences."
+)
+
 
 @router.get("/frequency-options", summary="Get available frequency options")
 async def get_frequency_options(
-    current_user: User = Depends(get_current_user_from_jwt)
+    current_user: User = Depends(get_current_user)
 ):
     """Get available recurring frequency options based on user's subscription tier"""
     
@@ -86,11 +90,15 @@ async def get_frequency_options(
     return {"options": options}
 
 
-@router.post("/", response_model=RecurringCampaignResponse, summary="Create recurring campaign")
-@require_feature('recurring_campaigns', error_message="Recurring campaigns require Pro plan or higher. Upgrade to create automated email sequences.")
+@router.post(
+    "/",
+    response_model=RecurringCampaignResponse,
+    summary="Create recurring campaign",
+    dependencies=[Depends(require_recurring_campaigns_to_create)]
+)
 async def create_recurring_campaign(
     campaign_data: RecurringCampaignCreate,
-    current_user: User = Depends(get_current_user_from_jwt),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -137,13 +145,17 @@ async def create_recurring_campaign(
         )
 
 
-@router.get("/", response_model=RecurringCampaignListResponse, summary="List recurring campaigns")
-@require_feature('recurring_campaigns')
+@router.get(
+    "/",
+    response_model=RecurringCampaignListResponse,
+    summary="List recurring campaigns",
+    dependencies=[Depends(require_recurring_campaigns)]
+)
 async def list_recurring_campaigns(
     status: Optional[RecurringStatus] = Query(None, description="Filter by campaign status"),
     skip: int = Query(0, ge=0, description="Number of campaigns to skip"),
     limit: int = Query(50, ge=1, le=100, description="Number of campaigns to return"),
-    current_user: User = Depends(get_current_user_from_jwt),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """List user's recurring campaigns with filtering and pagination"""
@@ -174,11 +186,15 @@ async def list_recurring_campaigns(
         )
 
 
-@router.get("/{campaign_id}", response_model=RecurringCampaignResponse, summary="Get recurring campaign")
-@require_feature('recurring_campaigns')
+@router.get(
+    "/{campaign_id}",
+    response_model=RecurringCampaignResponse,
+    summary="Get recurring campaign",
+    dependencies=[Depends(require_recurring_campaigns)]
+)
 async def get_recurring_campaign(
     campaign_id: str,
-    current_user: User = Depends(get_current_user_from_jwt),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific recurring campaign by ID"""
@@ -202,12 +218,16 @@ async def get_recurring_campaign(
     return RecurringCampaignResponse.from_orm(campaign)
 
 
-@router.put("/{campaign_id}", response_model=RecurringCampaignResponse, summary="Update recurring campaign")
-@require_feature('recurring_campaigns')
+@router.put(
+    "/{campaign_id}",
+    response_model=RecurringCampaignResponse,
+    summary="Update recurring campaign",
+    dependencies=[Depends(require_recurring_campaigns)]
+)
 async def update_recurring_campaign(
     campaign_id: str,
     update_data: RecurringCampaignUpdate,
-    current_user: User = Depends(get_current_user_from_jwt),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update a recurring campaign (limited updates allowed for active campaigns)"""
@@ -255,11 +275,14 @@ async def update_recurring_campaign(
     return RecurringCampaignResponse.from_orm(campaign)
 
 
-@router.post("/{campaign_id}/activate", summary="Activate recurring campaign")
-@require_feature('recurring_campaigns')
+@router.post(
+    "/{campaign_id}/activate",
+    summary="Activate recurring campaign",
+    dependencies=[Depends(require_recurring_campaigns)]
+)
 async def activate_recurring_campaign(
     campaign_id: str,
-    current_user: User = Depends(get_current_user_from_jwt),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Activate a draft recurring campaign to start sending"""
@@ -312,11 +335,14 @@ async def activate_recurring_campaign(
         )
 
 
-@router.post("/{campaign_id}/pause", summary="Pause recurring campaign")
-@require_feature('recurring_campaigns')
+@router.post(
+    "/{campaign_id}/pause",
+    summary="Pause recurring campaign",
+    dependencies=[Depends(require_recurring_campaigns)]
+)
 async def pause_recurring_campaign(
     campaign_id: str,
-    current_user: User = Depends(get_current_user_from_jwt),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Pause an active recurring campaign"""
@@ -341,11 +367,14 @@ async def pause_recurring_campaign(
         )
 
 
-@router.post("/{campaign_id}/resume", summary="Resume recurring campaign")
-@require_feature('recurring_campaigns')
+@router.post(
+    "/{campaign_id}/resume",
+    summary="Resume recurring campaign",
+    dependencies=[Depends(require_recurring_campaigns)]
+)
 async def resume_recurring_campaign(
     campaign_id: str,
-    current_user: User = Depends(get_current_user_from_jwt),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Resume a paused recurring campaign"""
@@ -370,11 +399,14 @@ async def resume_recurring_campaign(
         )
 
 
-@router.post("/{campaign_id}/cancel", summary="Cancel recurring campaign")
-@require_feature('recurring_campaigns')
+@router.post(
+    "/{campaign_id}/cancel",
+    summary="Cancel recurring campaign",
+    dependencies=[Depends(require_recurring_campaigns)]
+)
 async def cancel_recurring_campaign(
     campaign_id: str,
-    current_user: User = Depends(get_current_user_from_jwt),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Cancel a recurring campaign (cannot be undone)"""
@@ -399,13 +431,17 @@ async def cancel_recurring_campaign(
         )
 
 
-@router.get("/{campaign_id}/occurrences", response_model=RecurringOccurrenceListResponse, summary="Get campaign occurrences")
-@require_feature('recurring_campaigns')
+@router.get(
+    "/{campaign_id}/occurrences",
+    response_model=RecurringOccurrenceListResponse,
+    summary="Get campaign occurrences",
+    dependencies=[Depends(require_recurring_campaigns)]
+)
 async def get_campaign_occurrences(
     campaign_id: str,
     skip: int = Query(0, ge=0, description="Number of occurrences to skip"),
     limit: int = Query(50, ge=1, le=100, description="Number of occurrences to return"),
-    current_user: User = Depends(get_current_user_from_jwt),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get occurrences (individual sends) for a recurring campaign"""
@@ -436,11 +472,15 @@ async def get_campaign_occurrences(
         )
 
 
-@router.post("/preview-schedule", response_model=RecurringSchedulePreview, summary="Preview recurring schedule")
-@require_feature('recurring_campaigns')
+@router.post(
+    "/preview-schedule",
+    response_model=RecurringSchedulePreview,
+    summary="Preview recurring schedule",
+    dependencies=[Depends(require_recurring_campaigns)]
+)
 async def preview_recurring_schedule(
     schedule_data: RecurringCampaignCreate,
-    current_user: User = Depends(get_current_user_from_jwt)
+    current_user: User = Depends(get_current_user)
 ):
     """Preview the schedule for a recurring campaign configuration"""
     
@@ -509,11 +549,15 @@ async def preview_recurring_schedule(
         )
 
 
-@router.get("/{campaign_id}/analytics", response_model=RecurringCampaignAnalytics, summary="Get campaign analytics")
-@require_feature('recurring_campaigns')
+@router.get(
+    "/{campaign_id}/analytics",
+    response_model=RecurringCampaignAnalytics,
+    summary="Get campaign analytics",
+    dependencies=[Depends(require_recurring_campaigns)]
+)
 async def get_recurring_campaign_analytics(
     campaign_id: str,
-    current_user: User = Depends(get_current_user_from_jwt),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get comprehensive analytics for a recurring campaign"""
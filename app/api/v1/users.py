@@ -1,14 +1,18 @@
 """
 User authentication and management API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, BackgroundTasks
 from sqlalchemy.orm import Session
+from sqlalchemy import func, update, select, bindparam
 from typing import List, Optional
 from datetime import datetime, timedelta
 import uuid
+import hashlib
+import orjson
 
 from ...db import SessionLocal
 from ...database.user_models import User, UserSession, LoginAttempt, Role, UserRole, UserStatus
+from ...database.api_key_models import ApiKey
 from ...schemas.users import (
     UserCreate, UserResponse, LoginRequest, LoginResponse,
     RefreshTokenRequest, RefreshTokenResponse, UserUpdate,
@@ -18,7 +22,7 @@ from ...schemas.users import (
     UserWithRolesResponse, RoleResponse
 )
 from ...auth.jwt_auth import (
-    get_current_user, get_current_user, get_db
+    get_current_user, get_current_user, get_db, parse_bearer_token
 )
 from ...core.security import (
     hash_password, verify_password,
@@ -26,9 +30,124 @@ from ...core.security import (
     generate_random_token
 )
 from ...core.device_detection import get_device_info
+from ...core.cache import TTLCache, MISSING
 
 router = APIRouter(prefix="/api/v1/users", tags=["User Management"])
 
+# lower(email) -> user id (or None), so repeated lookups skip the database
+_user_id_by_email = TTLCache(maxsize=50_000, ttl=60)
+
+
+def _find_user_id_by_email(db: Session, email: str) -> Optional[str]:
+    """Resolve a user id from an email address, case-insensitively"""
+    key = email.lower()
+    user_id = _user_id_by_email.get(key, MISSING)
+    if user_id is MISSING:
+        row = db.query(User.id).filter(func.lower(User.email) == key).first()
+        user_id = row[0] if row else None
+        _user_id_by_email.set(key, user_id)
+    return user_id
+
+
+# Clients may reuse profile responses briefly; they are per-user only
+PROFILE_CACHE_CONTROL = "private, max-age=30"
+
+
+def _weak_etag(*parts) -> str:
+    """Build a weak ETag from the values that version a response"""
+    digest = hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+    return f'W/"{digest[:16]}"'
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds this ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": PROFILE_CACHE_CONTROL}
+        )
+    return None
+
+
+def _role_to_response(role: Role) -> RoleResponse:
+    """Build a RoleResponse directly from a Role row"""
+    return RoleResponse.model_construct(
+        id=role.id,
+        name=role.name,
+        description=role.description,
+        is_system=role.is_system,
+        permissions=role.permissions
+    )
+
+
+def _issue_password_reset(email: str) -> None:
+    """
+    Issue a password reset token for the account with this email, if any
+    
+    Runs as a background task with its own database session.
+    """
+    db = SessionLocal()
+    try:
+        user_id = _find_user_id_by_email(db, email)
+        if not user_id:
+            return
+        
+        now = datetime.utcnow()
+        db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                password_reset_token=generate_random_token(),
+                password_reset_sent_at=now,
+                password_reset_expires_at=now + timedelta(hours=1)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        
+        # TODO: Send password reset email
+    finally:
+        db.close()
+
+
+def _revoke_all_user_sessions(user_id: str, except_session_id: Optional[str] = None) -> int:
+    """
+    Revoke all active sessions for a user, optionally keeping one
+    
+    Opens its own database session so it can run as a background task
+    after the request-scoped session has been closed.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(UserSession).filter(
+            UserSession.user_id == user_id,
+            UserSession.is_active == True
+        )
+        if except_session_id:
+            query = query.filter(UserSession.id != except_session_id)
+        
+        revoked = query.update({
+            "is_active": False,
+            "revoked_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+        return revoked
+    finally:
+        db.close()
+
+
+# Built once at import so the compiled form is reused from the statement cache
+_ACTIVE_SESSIONS_STMT = (
+    select(UserSession)
+    .where(
+        UserSession.user_id == bindparam("user_id"),
+        UserSession.is_active == True,
+        UserSession.expires_at > bindparam("now")
+    )
+    .order_by(UserSession.last_activity_at.desc())
+)
+
 
 # ============= Registration & Login =============
 
@@ -40,7 +159,9 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     Creates a new user account with email verification required.
     """
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = db.query(User).filter(
+        func.lower(User.email) == user_data.email.lower()
+    ).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -91,6 +212,9 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(new_user)
     
+    # Drop any cached "no such user" entry for this email
+    _user_id_by_email.pop(new_user.email.lower())
+    
     # TODO: Send verification email
     
     return new_user
@@ -261,7 +385,7 @@ async def refresh_token(
         )
     
     # Get user
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -296,9 +420,8 @@ async def logout_user(
     Revokes the current session and invalidates tokens.
     """
     # Get token from header
-    auth_header = request.headers.get("Authorization", "")
-    if auth_header.startswith("Bearer "):
-        token = auth_header.replace("Bearer ", "")
+    token = parse_bearer_token(request.headers.get("Authorization"))
+    if token is not None:
         payload = decode_token(token)
         
         if payload:
@@ -344,14 +467,53 @@ async def logout_all_sessions(
 
 # ============= Profile Management =============
 
-@router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user: User = Depends(get_current_user)):
+@router.get("/me", response_model=UserWithRolesResponse)
+async def get_current_user_profile(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
     """
     Get current user profile
     
     Returns the current user's profile information including roles and permissions.
+    Supports conditional requests via ETag / If-None-Match.
     """
-    return current_user
+    now = datetime.utcnow()
+    active_roles = [
+        user_role for user_role in current_user.user_roles
+        if user_role.expires_at is None or user_role.expires_at > now
+    ]
+    
+    # Versioned by the assignments actually returned, so a role expiring
+    # changes the ETag even though no row was updated
+    etag = _weak_etag(
+        current_user.id,
+        current_user.updated_at.timestamp(),
+        *((user_role.id, user_role.role.updated_at) for user_role in active_roles)
+    )
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PROFILE_CACHE_CONTROL
+    
+    roles_data = [_role_to_response(user_role.role) for user_role in active_roles]
+    
+    # Values come straight from the ORM row, so skip re-validation
+    return UserWithRolesResponse.model_construct(
+        id=current_user.id,
+        email=current_user.email,
+        username=current_user.username,
+        full_name=current_user.full_name,
+        is_active=current_user.is_active,
+        is_verified=current_user.is_verified,
+        is_superuser=current_user.is_superuser,
+        two_factor_enabled=current_user.two_factor_enabled,
+        created_at=current_user.created_at,
+        last_login_at=current_user.last_login_at,
+        roles=roles_data
+    )
 
 
 @router.put("/me", response_model=UserResponse)
@@ -365,12 +527,15 @@ async def update_current_user_profile(
     
     Updates the current user's profile information.
     """
-    if user_update.full_name is not None:
+    changed = False
+    
+    if user_update.full_name is not None and user_update.full_name != current_user.full_name:
         current_user.full_name = user_update.full_name
+        changed = True
     
-    if user_update.username is not None:
+    if user_update.username is not None and user_update.username != current_user.username:
         # Check if username is taken
-        existing = db.query(User).filter(
+        existing = db.query(User.id).filter(
             User.username == user_update.username,
             User.id != current_user.id
         ).first()
@@ -380,12 +545,20 @@ async def update_current_user_profile(
                 detail="Username already taken"
             )
         current_user.username = user_update.username
+        changed = True
+    
+    # Nothing to write if the submitted values match what is stored
+    if not changed:
+        return current_user
     
     current_user.updated_at = datetime.utcnow()
+    
+    # Snapshot before commit: commit expires the instance and reading it
+    # afterwards would reload the whole row
+    profile = UserResponse.model_validate(current_user)
     db.commit()
-    db.refresh(current_user)
     
-    return current_user
+    return profile
 
 
 # ============= Password Management =============
@@ -393,6 +566,8 @@ async def update_current_user_profile(
 @router.post("/change-password", response_model=MessageResponse)
 async def change_password(
     password_data: PasswordChangeRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -400,6 +575,7 @@ async def change_password(
     Change user password
     
     Changes the current user's password after verifying the current password.
+    All other sessions are revoked in the background.
     """
     # Verify current password
     if not verify_password(password_data.current_password, current_user.hashed_password):
@@ -415,32 +591,34 @@ async def change_password(
     
     db.commit()
     
+    # Keep the session making this request, sign out everywhere else
+    current_session_id = None
+    token = parse_bearer_token(request.headers.get("Authorization"))
+    if token is not None:
+        payload = decode_token(token)
+        if payload:
+            current_session_id = payload.get("session_id")
+    
+    background_tasks.add_task(
+        _revoke_all_user_sessions, current_user.id, except_session_id=current_session_id
+    )
+    
     return MessageResponse(message="Password changed successfully")
 
 
 @router.post("/forgot-password", response_model=MessageResponse)
 async def forgot_password(
     reset_request: PasswordResetRequest,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks
 ):
     """
     Request password reset
     
     Sends a password reset email to the user if the email exists.
     """
-    user = db.query(User).filter(User.email == reset_request.email).first()
-    
-    # Don't reveal if email exists or not
-    if user:
-        # Generate reset token
-        reset_token = generate_random_token()
-        user.password_reset_token = reset_token
-        user.password_reset_sent_at = datetime.utcnow()
-        user.password_reset_expires_at = datetime.utcnow() + timedelta(hours=1)
-        
-        db.commit()
-        
-        # TODO: Send password reset email
+    # Lookup and token generation always run after the response, so the
+    # response time does not reveal whether the email exists
+    background_tasks.add_task(_issue_password_reset, reset_request.email)
     
     return MessageResponse(
         message="If the email exists, a password reset link has been sent"
@@ -450,40 +628,55 @@ async def forgot_password(
 @router.post("/reset-password", response_model=MessageResponse)
 async def reset_password(
     reset_data: PasswordResetConfirm,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
     Reset password using token
     
     Resets the user's password using a valid reset token.
+    All existing sessions are revoked in the background.
     """
-    user = db.query(User).filter(
+    reset = db.query(User.id, User.password_reset_expires_at).filter(
         User.password_reset_token == reset_data.token
     ).first()
     
-    if not user:
+    if not reset:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or expired reset token"
         )
     
+    now = datetime.utcnow()
+    
     # Check if token is expired
-    if user.password_reset_expires_at and user.password_reset_expires_at < datetime.utcnow():
+    if reset.password_reset_expires_at and reset.password_reset_expires_at < now:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Reset token has expired"
         )
     
-    # Update password
-    user.hashed_password = hash_password(reset_data.new_password)
-    user.password_reset_token = None
-    user.password_reset_sent_at = None
-    user.password_reset_expires_at = None
-    user.require_password_change = False
-    user.updated_at = datetime.utcnow()
+    # Update password and clear the reset token in a single statement
+    db.execute(
+        update(User)
+        .where(User.id == reset.id)
+        .values(
+            hashed_password=hash_password(reset_data.new_password),
+            password_reset_token=None,
+            password_reset_sent_at=None,
+            password_reset_expires_at=None,
+            require_password_change=False,
+            failed_login_attempts=0,
+            locked_until=None,
+            updated_at=now
+        )
+        .execution_options(synchronize_session=False)
+    )
     
     db.commit()
     
+    background_tasks.add_task(_revoke_all_user_sessions, reset.id)
+    
     return MessageResponse(message="Password reset successfully")
 
 
@@ -527,21 +720,25 @@ async def confirm_email_verification(
     
     Verifies the user's email using a valid verification token.
     """
-    user = db.query(User).filter(
-        User.email_verification_token == confirm_data.token
-    ).first()
+    # Mark email as verified and consume the token in a single statement
+    result = db.execute(
+        update(User)
+        .where(User.email_verification_token == confirm_data.token)
+        .values(
+            is_verified=True,
+            email_verified_at=datetime.utcnow(),
+            email_verification_token=None
+        )
+        .execution_options(synchronize_session=False)
+    )
     
-    if not user:
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid verification token"
         )
     
-    # Mark email as verified
-    user.is_verified = True
-    user.email_verified_at = datetime.utcnow()
-    user.email_verification_token = None
-    
     db.commit()
     
     return MessageResponse(message="Email verified successfully")
@@ -559,10 +756,10 @@ async def list_user_sessions(
     
     Returns a list of all active sessions for the current user.
     """
-    sessions = db.query(UserSession).filter(
-        UserSession.user_id == current_user.id,
-        UserSession.is_active == True
-    ).order_by(UserSession.last_activity_at.desc()).all()
+    sessions = db.execute(
+        _ACTIVE_SESSIONS_STMT,
+        {"user_id": current_user.id, "now": datetime.utcnow()}
+    ).scalars().all()
     
     return SessionListResponse(
         sessions=sessions,
@@ -604,9 +801,35 @@ async def revoke_user_session(
 
 @router.get("/me/api-keys")
 async def get_user_api_keys(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get user's API keys (without exposing the actual key values)"""
-    # TODO: Implement when API key models are ready
-    return {"message": "API keys endpoint - to be implemented"}
+    # Select only the listed columns; rows are read-only so skip ORM hydration
+    rows = db.query(
+        ApiKey.id,
+        ApiKey.name,
+        ApiKey.key_prefix,
+        ApiKey.requests_per_minute,
+        ApiKey.requests_per_day,
+        ApiKey.is_active,
+        ApiKey.expires_at,
+        ApiKey.created_at,
+        ApiKey.last_used_at
+    ).filter(
+        ApiKey.user_id == current_user.id
+    ).order_by(ApiKey.created_at.desc()).all()
+    
+    api_keys = [row._asdict() for row in rows]
+    payload = {"api_keys": api_keys, "total": len(api_keys)}
+    
+    etag = _weak_etag(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str).decode())
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PROFILE_CACHE_CONTROL
+    
+    return payload
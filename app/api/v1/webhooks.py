@@ -2,36 +2,454 @@
 Webhook API Endpoints
 Handles webhook event sending and management
 """
-from fastapi import APIRouter, HTTPException, Depends, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, update, select, lambda_stmt, tuple_, func, or_
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
+import asyncio
+import base64
+import binascii
+import functools
+import hmac
 import uuid
 import logging
 
-from ...db import SessionLocal
+import httpx
+import orjson
+
+from ...config_clean import settings
+from ...core.url_safety import UnsafeURLError, validate_public_url
+from ...db import AsyncSessionLocal, get_async_db
 from ...auth.jwt_auth import get_current_user
 from ...database.user_models import User
+from ...database.webhook_models import WebhookEvent
+from ...services.webhook_queue import WebhookEventQueue
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Initialize router
-router = APIRouter(prefix="/api/v1/webhooks", tags=["Webhooks"])
+router = APIRouter(
+    prefix="/api/v1/webhooks",
+    tags=["Webhooks"],
+    default_response_class=ORJSONResponse
+)
+
+
+# ============= Webhook Delivery =============
+
+WEBHOOK_MAX_ATTEMPTS = 5
+WEBHOOK_BATCH_MAX_EVENTS = 1000
+WEBHOOK_LIST_BODY_PREVIEW = 200
+WEBHOOK_USER_AGENT = "EmailTracker-Webhooks/1.0"
+_BASE_HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": WEBHOOK_USER_AGENT
+}
+WEBHOOK_DELIVERY_WORKERS = 64
+# Batches waiting for a worker; producers wait once this many are queued
+WEBHOOK_DELIVERY_QUEUE_SIZE = 1000
+WEBHOOK_MAX_CONCURRENT_REQUESTS = 256
+# How long shutdown waits for queued deliveries before cancelling workers
+WEBHOOK_DRAIN_TIMEOUT = 10.0
+# Lease a process takes on an event it is delivering, renewed on every
+# attempt; other processes only recover events whose lease has run out
+WEBHOOK_CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# When set, incoming events are buffered in Redis and bulk-inserted
+REDIS_URL = settings.redis_url
+
+# Shared client so deliveries reuse keep-alive connections instead of
+# paying a TCP/TLS handshake per webhook
+_webhook_client: Optional[httpx.AsyncClient] = None
+
+
+def get_webhook_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client used for webhook delivery"""
+    global _webhook_client
+    if _webhook_client is None or _webhook_client.is_closed:
+        _webhook_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            # A redirect could point at an internal address that was never
+            # validated, so 3xx responses are recorded as failed attempts
+            follow_redirects=False,
+            limits=httpx.Limits(
+                max_connections=1000,
+                max_keepalive_connections=100,
+                keepalive_expiry=30.0
+            )
+        )
+    return _webhook_client
+
+
+async def close_webhook_client() -> None:
+    """Close the shared webhook HTTP client (called on app shutdown)"""
+    global _webhook_client
+    if _webhook_client is not None:
+        await _webhook_client.aclose()
+        _webhook_client = None
+
+
+_event_queue: Optional[WebhookEventQueue] = None
+
+# Delivery batches are drained by a fixed pool of worker coroutines; the
+# semaphore caps in-flight requests across all of them
+_delivery_queue: Optional[asyncio.Queue] = None
+_delivery_workers: List[asyncio.Task] = []
+_delivery_tasks: set = set()
+_delivery_semaphore = asyncio.Semaphore(WEBHOOK_MAX_CONCURRENT_REQUESTS)
+
+
+async def start_webhooks() -> None:
+    """Create the delivery client and workers, and start the Redis event queue if configured"""
+    global _event_queue, _delivery_queue
+    get_webhook_client()
+    if _delivery_queue is None:
+        _delivery_queue = asyncio.Queue(maxsize=WEBHOOK_DELIVERY_QUEUE_SIZE)
+        _delivery_workers.extend(
+            asyncio.create_task(_delivery_worker(_delivery_queue))
+            for _ in range(WEBHOOK_DELIVERY_WORKERS)
+        )
+    if REDIS_URL and _event_queue is None:
+        _event_queue = WebhookEventQueue(REDIS_URL, on_flushed=_dispatch_deliveries)
+        _event_queue.start()
+    # Workers are already running, so this only waits once more than
+    # WEBHOOK_DELIVERY_QUEUE_SIZE batches are pending
+    await _recover_pending_deliveries()
+
+
+async def stop_webhooks() -> None:
+    """Flush the event queue, drain pending deliveries, stop the workers and close the client"""
+    global _event_queue, _delivery_queue
+    if _event_queue is not None:
+        await _event_queue.stop()
+        _event_queue = None
+    pending = [asyncio.ensure_future(task) for task in _delivery_tasks]
+    if _delivery_queue is not None:
+        pending.append(asyncio.ensure_future(_delivery_queue.join()))
+    if pending:
+        _, not_done = await asyncio.wait(pending, timeout=WEBHOOK_DRAIN_TIMEOUT)
+        if not_done:
+            # Rows left undelivered are picked up again by the next startup
+            logger.warning("Webhook deliveries still pending after %.0fs; cancelling", WEBHOOK_DRAIN_TIMEOUT)
+            for task in not_done:
+                task.cancel()
+    for worker in _delivery_workers:
+        worker.cancel()
+    await asyncio.gather(*_delivery_workers, return_exceptions=True)
+    _delivery_workers.clear()
+    _delivery_queue = None
+    await close_webhook_client()
+
+
+async def _claim_pending_deliveries(db: AsyncSession) -> List[Any]:
+    """
+    Claim up to one batch of stored events that are neither delivered,
+    exhausted nor leased by another process
+
+    The claim is a single UPDATE ... RETURNING over rows picked with
+    FOR UPDATE SKIP LOCKED, so concurrent processes never claim the same
+    event. (SQLite has no row locks but serializes writers, which gives the
+    same guarantee.)
+    """
+    now = datetime.utcnow()
+    claimable = (
+        select(WebhookEvent.id)
+        .where(
+            WebhookEvent.delivered.is_(False),
+            WebhookEvent.delivery_attempts < WebhookEvent.max_attempts,
+            or_(WebhookEvent.claimed_until.is_(None), WebhookEvent.claimed_until < now)
+        )
+        .order_by(WebhookEvent.created_at)
+        .limit(WEBHOOK_BATCH_MAX_EVENTS)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(WebhookEvent)
+        .where(WebhookEvent.id.in_(claimable))
+        .values(claimed_until=now + WEBHOOK_CLAIM_TIMEOUT)
+        .returning(
+            WebhookEvent.id, WebhookEvent.webhook_url, WebhookEvent.event_type,
+            WebhookEvent.payload, WebhookEvent.secret, WebhookEvent.delivery_attempts,
+            WebhookEvent.max_attempts
+        )
+        .execution_options(synchronize_session=False)
+    )
+    rows = (await db.execute(stmt)).all()
+    await db.commit()
+    return rows
+
+
+async def _recover_pending_deliveries() -> int:
+    """
+    Claim and re-queue stored events that were neither delivered nor exhausted
+
+    Covers events whose delivery was cut off by a restart, once their lease
+    has expired. Returns the number of events queued.
+    """
+    recovered = 0
+    try:
+        async with AsyncSessionLocal() as db:
+            while True:
+                rows = await _claim_pending_deliveries(db)
+                await _enqueue_deliveries([
+                    {
+                        "id": row.id,
+                        "webhook_url": row.webhook_url,
+                        "event_type": row.event_type,
+                        "payload": row.payload,
+                        "secret": row.secret,
+                        "previous_attempts": row.delivery_attempts,
+                        "max_attempts": row.max_attempts
+                    }
+                    for row in rows
+                ])
+                recovered += len(rows)
+                if len(rows) < WEBHOOK_BATCH_MAX_EVENTS:
+                    break
+    except Exception as e:
+        logger.exception("Error recovering pending webhook deliveries")
+    if recovered:
+        logger.info("Re-queued %d undelivered webhook events", recovered)
+    return recovered
 
 
-def get_db():
-    """Database session dependency"""
-    db = SessionLocal()
+async def _delivery_worker(queue: asyncio.Queue) -> None:
+    while True:
+        records = await queue.get()
+        try:
+            await deliver_webhook_batch(records)
+        except Exception as e:
+            logger.exception("Error delivering webhook batch")
+        finally:
+            queue.task_done()
+
+
+async def _enqueue_deliveries(records: List[Dict[str, Any]]) -> None:
+    """Hand delivery records to the worker pool, waiting while its queue is full"""
+    if not records:
+        return
+    if _delivery_queue is not None:
+        await _delivery_queue.put(records)
+        return
+    # Workers not started (app running without lifespan): deliver directly
+    task = asyncio.create_task(deliver_webhook_batch(records))
+    _delivery_tasks.add(task)
+    task.add_done_callback(_delivery_tasks.discard)
+
+
+def _event_row(
+    user_id: str,
+    webhook_url: str,
+    event_type: str,
+    payload: Dict[str, Any],
+    secret: Optional[str],
+    created_at: datetime
+) -> Dict[str, Any]:
+    """Build a webhook_events row for a new event"""
+    return {
+        "id": f"webhook_{uuid.uuid4()}",
+        "user_id": user_id,
+        "webhook_url": webhook_url,
+        "event_type": event_type,
+        "payload": payload,
+        "secret": secret,
+        "delivered": False,
+        "delivery_attempts": 0,
+        "max_attempts": WEBHOOK_MAX_ATTEMPTS,
+        # The process storing the event delivers it
+        "claimed_until": created_at + WEBHOOK_CLAIM_TIMEOUT,
+        "created_at": created_at
+    }
+
+
+async def _dispatch_deliveries(rows: List[Dict[str, Any]]) -> None:
+    """Start delivery of events flushed from the Redis queue"""
+    records = [
+        {
+            "id": row["id"],
+            "webhook_url": row["webhook_url"],
+            "event_type": row["event_type"],
+            "payload": row["payload"],
+            "secret": row["secret"]
+        }
+        for row in rows
+    ]
+    await _enqueue_deliveries(records)
+
+
+async def _record_delivery_attempts(attempts: List[Dict[str, Any]]) -> None:
+    """Persist the outcome of a round of delivery attempts in one executemany UPDATE"""
+    async with AsyncSessionLocal() as db:
+        try:
+            await db.execute(update(WebhookEvent), attempts)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.exception("Error recording delivery of %d webhook events", len(attempts))
+
+
+@functools.lru_cache(maxsize=2048)
+def _hmac_context(secret: str) -> "hmac.HMAC":
+    # Keyed HMAC state for a secret; copies skip re-deriving the key pads
+    return hmac.new(secret.encode('utf-8'), None, 'sha256')
+
+
+def _prepare_delivery(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize and sign a delivery record once, ahead of its attempts"""
+    body = orjson.dumps(record["payload"])
+    headers = {
+        **_BASE_HEADERS,
+        "X-EmailTracker-Event": record["event_type"],
+        "X-EmailTracker-Delivery-ID": record["id"]
+    }
+    if record.get("secret"):
+        signer = _hmac_context(record["secret"]).copy()
+        signer.update(body)
+        signature = signer.hexdigest()
+        headers["X-EmailTracker-Signature"] = f"sha256={signature}"
+    return {
+        "id": record["id"],
+        "webhook_url": record["webhook_url"],
+        "body": body,
+        "headers": headers,
+        "previous_attempts": record.get("previous_attempts", 0),
+        "max_attempts": record.get("max_attempts", WEBHOOK_MAX_ATTEMPTS)
+    }
+
+
+async def _attempt_delivery(
+    client: httpx.AsyncClient,
+    delivery: Dict[str, Any],
+    attempt: int
+) -> Dict[str, Any]:
+    """POST one delivery attempt and return the bookkeeping values for its row"""
+    result = {
+        "id": delivery["id"],
+        "delivery_attempts": delivery["previous_attempts"] + attempt,
+        "delivered": False,
+        "response_code": None,
+        "response_body": None,
+        "error_message": None,
+        "delivered_at": None
+    }
     try:
-        yield db
-    finally:
-        db.close()
+        # Re-resolve on every attempt: the host's DNS may have changed since
+        # the URL was accepted
+        await validate_public_url(delivery["webhook_url"])
+        async with _delivery_semaphore:
+            response = await client.post(
+                delivery["webhook_url"], content=delivery["body"], headers=delivery["headers"]
+            )
+        result["delivered"] = response.is_success
+        result["response_code"] = response.status_code
+        result["response_body"] = response.text[:1000] if response.text else None
+        if not response.is_success:
+            logger.warning(
+                "Webhook event %s attempt %d failed with status %d",
+                delivery["id"], attempt, response.status_code
+            )
+    except (httpx.HTTPError, UnsafeURLError) as e:
+        result["error_message"] = str(e)
+        logger.warning("Webhook event %s attempt %d failed: %s", delivery["id"], attempt, e)
+    
+    now = datetime.utcnow()
+    result["last_attempt_at"] = now
+    result["claimed_until"] = now + WEBHOOK_CLAIM_TIMEOUT
+    if result["delivered"]:
+        result["delivered_at"] = now
+    return result
+
+
+async def deliver_webhook_batch(records: List[Dict[str, Any]]) -> int:
+    """
+    Deliver a batch of webhook events, retrying failures with exponential backoff
+    
+    Each record carries ``id``, ``webhook_url``, ``event_type``, ``payload``
+    and ``secret``, plus optional ``previous_attempts`` and ``max_attempts``
+    when redelivering a stored event; each event gets only the attempts left
+    in its budget. Every round of attempts is sent concurrently and its
+    outcomes are written back with a single UPDATE, which also renews the
+    event's lease until its last attempt. Returns the number of events
+    delivered.
+    """
+    client = get_webhook_client()
+    pending = [_prepare_delivery(record) for record in records]
+    pending = [
+        delivery for delivery in pending
+        if delivery["previous_attempts"] < delivery["max_attempts"]
+    ]
+    rounds = max(
+        (delivery["max_attempts"] - delivery["previous_attempts"] for delivery in pending),
+        default=0
+    )
+    delivered_count = 0
+    
+    for attempt in range(1, rounds + 1):
+        results = await asyncio.gather(
+            *(_attempt_delivery(client, delivery, attempt) for delivery in pending)
+        )
+        retry = []
+        for delivery, result in zip(pending, results):
+            if result["delivered"]:
+                delivered_count += 1
+            elif result["delivery_attempts"] < delivery["max_attempts"]:
+                retry.append(delivery)
+                continue
+            else:
+                logger.error(
+                    "Webhook event %s not delivered after %d attempts",
+                    delivery["id"], result["delivery_attempts"]
+                )
+            # Finished either way: release the lease
+            result["claimed_until"] = None
+        await _record_delivery_attempts(results)
+        
+        pending = retry
+        if not pending:
+            break
+        await asyncio.sleep(2 ** attempt)
+    
+    if delivered_count:
+        logger.info("%d of %d webhook events delivered", delivered_count, len(records))
+    return delivered_count
+
+
+async def deliver_webhook(
+    event_id: str,
+    webhook_url: str,
+    event_type: str,
+    payload: Dict[str, Any],
+    secret: Optional[str] = None
+) -> bool:
+    """
+    Deliver a single webhook event, retrying with exponential backoff
+    
+    Returns True once the endpoint answers with a 2xx status.
+    """
+    record = {
+        "id": event_id,
+        "webhook_url": webhook_url,
+        "event_type": event_type,
+        "payload": payload,
+        "secret": secret
+    }
+    return await deliver_webhook_batch([record]) == 1
 
 
 # ============= Pydantic Schemas =============
 
+class WebhookEventCreate(BaseModel):
+    """Schema for one event in a batch send request"""
+    webhook_url: str
+    event_type: str
+    payload: Dict[str, Any]
+    secret: Optional[str] = None
+
+
 class WebhookEventResponse(BaseModel):
     """Schema for webhook event"""
     event_id: str
@@ -65,6 +483,36 @@ class WebhookEventDetail(BaseModel):
     delivery_history: List[Dict[str, Any]] = []
 
 
+def _encode_cursor(created_at: datetime, event_id: str) -> str:
+    """Encode the (created_at, id) position of the last event on a page"""
+    raw = f"{created_at.isoformat()}|{event_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Decode a pagination cursor; raises ValueError if it is malformed"""
+    try:
+        created_at, event_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|', 1)
+        return datetime.fromisoformat(created_at), event_id
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(str(e))
+
+
+async def _require_public_urls(*urls: str) -> None:
+    """Reject webhook URLs that are not http(s) or resolve to internal addresses"""
+    results = await asyncio.gather(
+        *(validate_public_url(url) for url in set(urls)), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, UnsafeURLError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid webhook URL: {result}"
+            )
+        if isinstance(result, BaseException):
+            raise result
+
+
 # ============= API Endpoints =============
 
 @router.post("/events/send", status_code=status.HTTP_202_ACCEPTED)
@@ -74,7 +522,7 @@ async def send_webhook_event(
     payload: Dict[str, Any] = ...,
     secret: Optional[str] = Query(None, description="Optional secret for signature verification"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send a webhook event
@@ -93,17 +541,33 @@ async def send_webhook_event(
     - Signature verification support
     - Delivery confirmation tracking
     """
+    await _require_public_urls(webhook_url)
+
     try:
-        # Generate webhook event ID
-        event_id = f"webhook_{uuid.uuid4()}"
+        row = _event_row(
+            current_user.id, webhook_url, event_type, payload, secret, datetime.utcnow()
+        )
+        event_id = row["id"]
         
-        # In a real implementation, you would:
-        # 1. Store the webhook event in database
-        # 2. Queue it for background delivery
-        # 3. Implement retry logic with exponential backoff
-        # 4. Generate HMAC signature if secret provided
+        # Durable Redis queue: the flusher stores and dispatches in bulk
+        if _event_queue is not None:
+            await _event_queue.enqueue(row)
+        else:
+            # Store the webhook event for delivery tracking; the id is generated
+            # here, so a plain INSERT is enough and nothing needs reloading
+            await db.execute(insert(WebhookEvent).values(row))
+            await db.commit()
+            
+            # Deliver via the worker pool with retries and optional HMAC signature
+            await _enqueue_deliveries([{
+                "id": event_id,
+                "webhook_url": webhook_url,
+                "event_type": event_type,
+                "payload": payload,
+                "secret": secret
+            }])
         
-        logger.info(f"Webhook event queued: {event_id} for user {current_user.id}")
+        logger.info("Webhook event queued: %s for user %s", event_id, current_user.id)
         
         return {
             "event_id": event_id,
@@ -114,71 +578,162 @@ async def send_webhook_event(
         }
         
     except Exception as e:
-        logger.error(f"Error queueing webhook event: {str(e)}")
+        logger.exception("Error queueing webhook event")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to queue webhook event: {str(e)}"
         )
 
 
+@router.post("/events/send-batch", status_code=status.HTTP_202_ACCEPTED)
+async def send_webhook_events_batch(
+    events: List[WebhookEventCreate],
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Send a batch of webhook events
+    
+    Stores all events in a single round trip and queues each one for delivery.
+    
+    **Request Body:**
+    - List of events, each with **webhook_url**, **event_type**, **payload**
+      and an optional **secret** (max 1000 events per request)
+    """
+    if len(events) > WEBHOOK_BATCH_MAX_EVENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {WEBHOOK_BATCH_MAX_EVENTS} events"
+        )
+    await _require_public_urls(*(event.webhook_url for event in events))
+
+    try:
+        now = datetime.utcnow()
+        rows = [
+            _event_row(
+                current_user.id, event.webhook_url, event.event_type,
+                event.payload, event.secret, now
+            )
+            for event in events
+        ]
+        
+        if _event_queue is not None:
+            await _event_queue.enqueue(*rows)
+        else:
+            # One executemany INSERT instead of a unit-of-work flush per event
+            if rows:
+                await db.execute(insert(WebhookEvent), rows)
+                await db.commit()
+            
+            await _enqueue_deliveries([
+                {
+                    "id": row["id"],
+                    "webhook_url": event.webhook_url,
+                    "event_type": event.event_type,
+                    "payload": event.payload,
+                    "secret": event.secret
+                }
+                for row, event in zip(rows, events)
+            ])
+        
+        logger.info("%d webhook events queued for user %s", len(rows), current_user.id)
+        
+        return {
+            "event_ids": [row["id"] for row in rows],
+            "count": len(rows),
+            "status": "queued",
+            "message": "Webhook events queued for delivery"
+        }
+        
+    except Exception as e:
+        await db.rollback()
+        logger.exception("Error queueing webhook events")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to queue webhook events: {str(e)}"
+        )
+
+
 @router.get("/events", response_model=List[WebhookEventResponse])
 async def list_webhook_events(
+    response: Response,
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of events to return"),
-    offset: int = Query(0, ge=0, description="Number of events to skip for pagination"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     delivered: Optional[bool] = Query(None, description="Filter by delivery status"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List webhook events
     
-    Get a list of webhook events with their delivery status.
+    Get a list of webhook events with their delivery status, newest first.
+    When more events are available the response carries an
+    **X-Next-Cursor** header to pass as `cursor` for the next page.
     
     **Query Parameters:**
     - **limit**: Maximum number of events to return (default: 100, max: 1000)
-    - **offset**: Number of events to skip for pagination (default: 0)
+    - **cursor**: Pagination cursor from the previous page (optional)
     - **delivered**: Filter by delivery status (optional)
     """
+    cursor_created_at = cursor_id = None
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = _decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+    
     try:
-        # In a real implementation, query webhook events from database
-        # For now, return mock data
-        events = []
+        user_id = current_user.id
+        # Keyset pagination on (created_at, id) stays O(limit) at any depth;
+        # lambda_stmt caches the compiled SQL across calls
+        # Only the listed columns are selected, as plain rows rather than ORM objects
+        stmt = lambda_stmt(lambda: select(
+            WebhookEvent.id, WebhookEvent.webhook_url, WebhookEvent.event_type,
+            WebhookEvent.payload, WebhookEvent.delivered, WebhookEvent.delivery_attempts,
+            WebhookEvent.last_attempt_at, WebhookEvent.delivered_at, WebhookEvent.response_code,
+            func.substr(WebhookEvent.response_body, 1, WEBHOOK_LIST_BODY_PREVIEW),
+            WebhookEvent.created_at
+        ).where(WebhookEvent.user_id == user_id))
+        if delivered is not None:
+            stmt += lambda s: s.where(WebhookEvent.delivered == delivered)
+        if cursor_id is not None:
+            stmt += lambda s: s.where(
+                tuple_(WebhookEvent.created_at, WebhookEvent.id) < tuple_(cursor_created_at, cursor_id)
+            )
+        stmt += lambda s: s.order_by(
+            WebhookEvent.created_at.desc(), WebhookEvent.id.desc()
+        ).limit(limit)
         
-        # Example mock events
-        if not delivered or delivered == True:
-            events.append({
-                "event_id": f"webhook_{uuid.uuid4()}",
-                "webhook_url": "https://example.com/webhooks",
-                "event_type": "email.opened",
-                "payload": {"tracker_id": str(uuid.uuid4()), "timestamp": datetime.utcnow().isoformat()},
-                "delivered": True,
-                "delivery_attempts": 1,
-                "last_attempt_at": datetime.utcnow(),
-                "delivered_at": datetime.utcnow(),
-                "response_code": 200,
-                "response_body": "OK",
-                "created_at": datetime.utcnow()
-            })
+        rows = (await db.execute(stmt)).all()
         
-        if not delivered or delivered == False:
-            events.append({
-                "event_id": f"webhook_{uuid.uuid4()}",
-                "webhook_url": "https://example.com/webhooks/failed",
-                "event_type": "email.sent",
-                "payload": {"tracker_id": str(uuid.uuid4()), "timestamp": datetime.utcnow().isoformat()},
-                "delivered": False,
-                "delivery_attempts": 3,
-                "last_attempt_at": datetime.utcnow(),
-                "delivered_at": None,
-                "response_code": 500,
-                "response_body": "Internal Server Error",
-                "created_at": datetime.utcnow()
-            })
+        if len(rows) == limit:
+            response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1][10], rows[-1][0])
         
-        return events[offset:offset+limit]
+        return [
+            {
+                "event_id": event_id,
+                "webhook_url": webhook_url,
+                "event_type": event_type,
+                "payload": payload,
+                "delivered": is_delivered,
+                "delivery_attempts": delivery_attempts,
+                "last_attempt_at": last_attempt_at,
+                "delivered_at": delivered_at,
+                "response_code": response_code,
+                "response_body": response_body,
+                "created_at": created_at
+            }
+            for (
+                event_id, webhook_url, event_type, payload, is_delivered, delivery_attempts,
+                last_attempt_at, delivered_at, response_code, response_body, created_at
+            ) in rows
+        ]
         
     except Exception as e:
-        logger.error(f"Error listing webhook events: {str(e)}")
+        logger.exception("Error listing webhook events")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to list webhook events: {str(e)}"
@@ -189,7 +744,7 @@ async def list_webhook_events(
 async def get_webhook_event(
     event_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get webhook event details
@@ -200,44 +755,53 @@ async def get_webhook_event(
     **Path Parameters:**
     - **event_id**: Unique webhook event identifier
     """
+    event = (await db.execute(
+        select(WebhookEvent).where(
+            WebhookEvent.id == event_id,
+            WebhookEvent.user_id == current_user.id
+        )
+    )).scalars().first()
+    
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Webhook event not found"
+        )
+    
     try:
-        # In a real implementation, query webhook event from database
-        # For now, return mock data
+        # Only the latest attempt is stored
+        delivery_history = []
+        if event.last_attempt_at:
+            delivery_history.append({
+                "attempt": event.delivery_attempts,
+                "timestamp": event.last_attempt_at.isoformat(),
+                "response_code": event.response_code,
+                "response_body": event.response_body,
+                "error_message": event.error_message
+            })
         
+        # The JSON column hands back the payload already decoded
         event_detail = {
-            "event_id": event_id,
-            "webhook_url": "https://example.com/webhooks",
-            "event_type": "email.opened",
-            "payload": {
-                "tracker_id": str(uuid.uuid4()),
-                "campaign_id": str(uuid.uuid4()),
-                "recipient": "user@example.com",
-                "timestamp": datetime.utcnow().isoformat()
-            },
-            "delivered": True,
-            "delivery_attempts": 1,
-            "max_attempts": 5,
-            "created_at": datetime.utcnow(),
-            "last_attempt_at": datetime.utcnow(),
-            "delivered_at": datetime.utcnow(),
-            "response_code": 200,
-            "response_body": "OK",
-            "error_message": None,
-            "delivery_history": [
-                {
-                    "attempt": 1,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "response_code": 200,
-                    "response_body": "OK",
-                    "duration_ms": 145
-                }
-            ]
+            "event_id": event.id,
+            "webhook_url": event.webhook_url,
+            "event_type": event.event_type,
+            "payload": event.payload,
+            "delivered": event.delivered,
+            "delivery_attempts": event.delivery_attempts,
+            "max_attempts": event.max_attempts,
+            "created_at": event.created_at,
+            "last_attempt_at": event.last_attempt_at,
+            "delivered_at": event.delivered_at,
+            "response_code": event.response_code,
+            "response_body": event.response_body,
+            "error_message": event.error_message,
+            "delivery_history": delivery_history
         }
         
         return event_detail
         
     except Exception as e:
-        logger.error(f"Error getting webhook event {event_id}: {str(e)}")
+        logger.exception("Error getting webhook event %s", event_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get webhook event: {str(e)}"
@@ -248,7 +812,7 @@ async def get_webhook_event(
 async def retry_webhook_event(
     event_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retry webhook event delivery
@@ -258,13 +822,66 @@ async def retry_webhook_event(
     **Path Parameters:**
     - **event_id**: Unique webhook event identifier
     """
+    delivered = (await db.execute(
+        select(WebhookEvent.delivered).where(
+            WebhookEvent.id == event_id,
+            WebhookEvent.user_id == current_user.id
+        )
+    )).scalar_one_or_none()
+    
+    if delivered is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Webhook event not found"
+        )
+    
+    if delivered:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Webhook event has already been delivered"
+        )
+    
+    # Claim the event and grant it a fresh round of attempts, unless a
+    # delivery (here or in another process) still holds its lease
+    now = datetime.utcnow()
+    event = (await db.execute(
+        update(WebhookEvent)
+        .where(
+            WebhookEvent.id == event_id,
+            WebhookEvent.delivered.is_(False),
+            or_(WebhookEvent.claimed_until.is_(None), WebhookEvent.claimed_until < now)
+        )
+        .values(
+            max_attempts=WebhookEvent.delivery_attempts + WEBHOOK_MAX_ATTEMPTS,
+            claimed_until=now + WEBHOOK_CLAIM_TIMEOUT
+        )
+        .returning(
+            WebhookEvent.id, WebhookEvent.webhook_url, WebhookEvent.event_type,
+            WebhookEvent.payload, WebhookEvent.secret, WebhookEvent.delivery_attempts,
+            WebhookEvent.max_attempts
+        )
+        .execution_options(synchronize_session=False)
+    )).first()
+    await db.commit()
+    
+    if event is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Webhook event is already being delivered"
+        )
+    
     try:
-        # In a real implementation:
-        # 1. Verify webhook event exists and belongs to user
-        # 2. Check if event is eligible for retry
-        # 3. Queue the event for immediate retry
+        await _enqueue_deliveries([{
+            "id": event.id,
+            "webhook_url": event.webhook_url,
+            "event_type": event.event_type,
+            "payload": event.payload,
+            "secret": event.secret,
+            "previous_attempts": event.delivery_attempts,
+            "max_attempts": event.max_attempts
+        }])
         
-        logger.info(f"Retrying webhook event {event_id} for user {current_user.id}")
+        logger.info("Retrying webhook event %s for user %s", event_id, current_user.id)
         
         return {
             "event_id": event_id,
@@ -273,7 +890,7 @@ async def retry_webhook_event(
         }
         
     except Exception as e:
-        logger.error(f"Error retrying webhook event {event_id}: {str(e)}")
+        logger.exception("Error retrying webhook event %s", event_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retry webhook event: {str(e)}"
@@ -1,23 +1,61 @@
 """
 JWT authentication and authorization dependencies
 """
-from fastapi import Depends, HTTPException, status, Header
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import Depends, HTTPException, Request, Security, status, Header
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import select, bindparam, and_
+from typing import Optional, Mapping, Tuple
 from datetime import datetime
+from types import MappingProxyType
 
 from ..db import SessionLocal
 from ..database.user_models import User, UserSession
 from ..core.security import decode_token
 
 
-# Security scheme
-security = HTTPBearer()
+# Error details and the bearer challenge header are built once rather than
+# on every rejected request
+ERROR_MESSAGES: Mapping[str, str] = MappingProxyType({
+    "not_authenticated": "Not authenticated",
+    "invalid_token": "Invalid or expired token",
+    "invalid_payload": "Invalid token payload",
+    "user_not_found": "User not found",
+    "session_revoked": "Session has been revoked",
+    "user_inactive": "User account is inactive",
+    "account_locked": "Account is temporarily locked",
+    "email_not_verified": "Email not verified. Please verify your email.",
+    "superuser_required": "Not enough permissions. Admin access required.",
+})
+BEARER_CHALLENGE: Mapping[str, str] = MappingProxyType({"WWW-Authenticate": "Bearer"})
 
+# Declares the bearer scheme in the OpenAPI schema (the docs' Authorize
+# button); the token itself is parsed by get_current_user
+bearer_scheme = HTTPBearer(auto_error=False)
 
-def get_db():
-    """Database session dependency"""
+# Built once so the auth path only binds the ids on each request. The user
+# and the token's session come back in one round trip; the session id is
+# NULL once the session was logged out, revoked or has expired, so
+# revocation is read from the database rather than process memory
+USER_WITH_SESSION_STMT = (
+    select(User, UserSession.id)
+    .outerjoin(
+        UserSession,
+        and_(
+            UserSession.id == bindparam("session_id"),
+            UserSession.user_id == User.id,
+            UserSession.is_active == True,
+            UserSession.revoked_at.is_(None),
+            UserSession.expires_at > bindparam("now")
+        )
+    )
+    .where(User.id == bindparam("user_id"))
+)
+
+
+async def get_db():
+    """Database session dependency (async so FastAPI does not hop to a thread to open it)"""
     db = SessionLocal()
     try:
         yield db
@@ -25,59 +63,103 @@ def get_db():
         db.close()
 
 
+def _load_user(db: Session, user_id: str, session_id: str) -> Tuple[Optional[User], bool]:
+    """Return the user and whether the token's session is still live"""
+    row = db.execute(
+        USER_WITH_SESSION_STMT,
+        {"user_id": user_id, "session_id": session_id, "now": datetime.utcnow()}
+    ).first()
+    if row is None:
+        return None, False
+    return row[0], row[1] is not None
+
+
+def parse_bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Return the token from a "Bearer <token>" Authorization header, or None"""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    # Only the scheme is case-folded, never the token
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token
+
+
+def _check_user_status(user: User) -> None:
+    """Reject inactive or locked accounts; the usual active, never-locked user passes one test"""
+    if user.is_active and user.locked_until is None:
+        return
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=ERROR_MESSAGES["user_inactive"]
+        )
+    
+    if user.is_locked():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=ERROR_MESSAGES["account_locked"]
+        )
+
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_db),
+    _credentials: Optional[HTTPAuthorizationCredentials] = Security(bearer_scheme)
 ) -> User:
     """
     Get current authenticated user from JWT token
     
+    The bearer token is read straight from the Authorization header;
+    bearer_scheme is only there to document the scheme.
+    
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
+    token = parse_bearer_token(request.headers.get("authorization"))
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=ERROR_MESSAGES["not_authenticated"]
+        )
     
     # Decode token
     payload = decode_token(token)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
+            detail=ERROR_MESSAGES["invalid_token"],
+            headers=BEARER_CHALLENGE,
         )
     
-    # Extract user ID
+    # Extract user and session IDs
     user_id: str = payload.get("sub")
-    if user_id is None:
+    session_id: str = payload.get("session_id")
+    if user_id is None or session_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload",
-            headers={"WWW-Authenticate": "Bearer"},
+            detail=ERROR_MESSAGES["invalid_payload"],
+            headers=BEARER_CHALLENGE,
         )
     
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    # Token checks are pure CPU and stay on the event loop; only the
+    # blocking database lookup is sent to the threadpool
+    user, session_live = await run_in_threadpool(_load_user, db, user_id, session_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    # Check if user is active
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User account is inactive"
+            detail=ERROR_MESSAGES["user_not_found"],
+            headers=BEARER_CHALLENGE,
         )
-    
-    # Check if account is locked
-    if user.is_locked():
+    if not session_live:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account is temporarily locked"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=ERROR_MESSAGES["session_revoked"],
+            headers=BEARER_CHALLENGE,
         )
     
+    _check_user_status(user)
     return user
 
 
@@ -88,7 +170,7 @@ async def get_current_active_user(
     if not current_user.is_verified:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Email not verified. Please verify your email."
+            detail=ERROR_MESSAGES["email_not_verified"]
         )
     return current_user
 
@@ -100,7 +182,7 @@ async def get_current_superuser(
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions. Admin access required."
+            detail=ERROR_MESSAGES["superuser_required"]
         )
     return current_user
 
@@ -112,21 +194,19 @@ async def optional_auth(
     """
     Optional authentication - returns user if token provided, None otherwise
     """
-    if not authorization:
+    token = parse_bearer_token(authorization)
+    if token is None:
         return None
     
-    if not authorization.startswith("Bearer "):
-        return None
-    
-    token = authorization.replace("Bearer ", "")
     payload = decode_token(token)
     
     if payload is None:
         return None
     
     user_id = payload.get("sub")
-    if not user_id:
+    session_id = payload.get("session_id")
+    if not user_id or not session_id:
         return None
     
-    user = db.query(User).filter(User.id == user_id).first()
-    return user
+    user, session_live = await run_in_threadpool(_load_user, db, user_id, session_id)
+    return user if session_live else None
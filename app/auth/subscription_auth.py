@@ -1,126 +1,197 @@
 """
 Decorators and middleware for subscription tier-based access control
 """
-from functools import wraps
+import asyncio
+import logging
+from contextvars import ContextVar
+from functools import lru_cache, wraps
 from fastapi import HTTPException, Depends
 from sqlalchemy.orm import Session
-from typing import Optional, List, Callable, Any
+from typing import Optional, List, Callable, Any, Set
 
 from ..database.user_models import User
-from ..services.subscription_service import get_user_access_service
-from ..dependencies import get_db
+from ..services.subscription_service import FeatureAccessService, get_user_access_service, PlanLevel
+from ..db import SessionLocal
+from .jwt_auth import get_current_user, get_db
 
 
-def require_feature(feature: str, error_message: Optional[str] = None):
+logger = logging.getLogger(__name__)
+
+
+# Access service for the current request. Each request runs in its own task
+# with its own copy of the context, so nothing leaks between requests.
+_access_service_ctx: ContextVar[Optional[FeatureAccessService]] = ContextVar(
+    "access_service", default=None
+)
+
+
+def _get_cached_access_service(user: User, db: Session) -> FeatureAccessService:
+    """
+    Return the access service for this request's user, building it once.
+    
+    Stacked decorators and dependencies share the instance (and the plan
+    it has already loaded) instead of each constructing their own. Building
+    it never awaits, so coroutines in one request cannot race to create it.
+    """
+    access_service = _access_service_ctx.get()
+    if access_service is None or access_service.user_id != user.id or access_service.db is not db:
+        access_service = get_user_access_service(user.id, db)
+        _access_service_ctx.set(access_service)
+    return access_service
+
+
+def _get_user_and_db(kwargs: dict, current_user_param: str, db_param: str):
+    """Pick the authenticated user and session out of the endpoint's kwargs by name"""
+    current_user = kwargs.get(current_user_param)
+    db = kwargs.get(db_param)
+    if not current_user or not db:
+        raise HTTPException(
+            status_code=500,
+            detail="Internal error: Missing user or database session"
+        )
+    return current_user, db
+
+
+# Error bodies for denied requests are built once per distinct combination;
+# HTTPException only serializes them, so the cached dicts are never mutated
+@lru_cache(maxsize=256)
+def _feature_denied_detail(feature: str, plan_name: str, error_message: Optional[str] = None) -> dict:
+    default_message = f"This feature requires a higher subscription tier. Current plan: {plan_name}"
+    return {
+        "error": "feature_access_denied",
+        "message": error_message or default_message,
+        "required_feature": feature,
+        "current_plan": plan_name,
+        "upgrade_required": True
+    }
+
+
+@lru_cache(maxsize=256)
+def _plan_required_detail(
+    required_plan: str,
+    current_plan: str,
+    current_plan_display_name: str,
+    error_message: Optional[str] = None
+) -> dict:
+    default_message = f"This feature requires {required_plan.title()} plan or higher. Current plan: {current_plan_display_name}"
+    return {
+        "error": "plan_upgrade_required",
+        "message": error_message or default_message,
+        "current_plan": current_plan,
+        "required_plan": required_plan,
+        "upgrade_required": True
+    }
+
+
+def _check_feature(access_service, feature: str, error_message: Optional[str] = None) -> None:
+    """Raise 403 unless the user's plan includes the feature"""
+    if not access_service.has_feature(feature):
+        raise HTTPException(
+            status_code=403,
+            detail=_feature_denied_detail(feature, access_service.get_plan_display_name(), error_message)
+        )
+
+
+def _check_plan(
+    access_service,
+    required_plan: str,
+    required_level: PlanLevel,
+    error_message: Optional[str] = None
+) -> None:
+    """Raise 403 unless the user is on required_plan (at required_level) or higher"""
+    if access_service.plan_level < required_level:
+        raise HTTPException(
+            status_code=403,
+            detail=_plan_required_detail(
+                required_plan,
+                access_service.get_plan_name(),
+                access_service.get_plan_display_name(),
+                error_message
+            )
+        )
+
+
+def require_feature(
+    feature: str,
+    error_message: Optional[str] = None,
+    current_user_param: str = "current_user",
+    db_param: str = "db"
+):
     """
     Decorator to require a specific feature for endpoint access.
     
+    Prefer create_feature_checker() as a route dependency for new endpoints.
+    
     Args:
         feature: The feature name to check (e.g., 'ab_testing', 'segmentation')
         error_message: Custom error message if access is denied
+        current_user_param: Name of the endpoint's authenticated user parameter
+        db_param: Name of the endpoint's database session parameter
     """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Extract current_user and db from the function arguments/kwargs
-            current_user = None
-            db = None
-            
-            # Look for current_user and db in kwargs (FastAPI dependency injection)
-            for key, value in kwargs.items():
-                if isinstance(value, User):
-                    current_user = value
-                elif hasattr(value, 'query'):  # SQLAlchemy Session
-                    db = value
-            
-            if not current_user or not db:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Internal error: Missing user or database session"
-                )
+            current_user, db = _get_user_and_db(kwargs, current_user_param, db_param)
             
             # Check feature access
-            access_service = get_user_access_service(current_user.id, db)
-            
-            if not access_service.has_feature(feature):
-                plan_name = access_service.get_plan_display_name()
-                
-                default_message = f"This feature requires a higher subscription tier. Current plan: {plan_name}"
-                message = error_message or default_message
-                
-                raise HTTPException(
-                    status_code=403,
-                    detail={
-                        "error": "feature_access_denied",
-                        "message": message,
-                        "required_feature": feature,
-                        "current_plan": plan_name,
-                        "upgrade_required": True
-                    }
-                )
+            access_service = _get_cached_access_service(current_user, db)
+            _check_feature(access_service, feature, error_message)
             
             return await func(*args, **kwargs)
         return wrapper
     return decorator
 
 
-def require_plan(required_plan: str, error_message: Optional[str] = None):
+def require_plan(
+    required_plan: str,
+    error_message: Optional[str] = None,
+    current_user_param: str = "current_user",
+    db_param: str = "db"
+):
     """
     Decorator to require a specific subscription plan or higher.
     
+    Prefer create_plan_checker() as a route dependency for new endpoints.
+    
     Args:
         required_plan: The minimum plan required ('free', 'pro', 'enterprise')
         error_message: Custom error message if access is denied
+        current_user_param: Name of the endpoint's authenticated user parameter
+        db_param: Name of the endpoint's database session parameter
     """
-    plan_hierarchy = {'free': 0, 'pro': 1, 'enterprise': 2}
+    required_level = PlanLevel.from_name(required_plan)
     
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Extract current_user and db from the function arguments/kwargs
-            current_user = None
-            db = None
-            
-            for key, value in kwargs.items():
-                if isinstance(value, User):
-                    current_user = value
-                elif hasattr(value, 'query'):  # SQLAlchemy Session
-                    db = value
-            
-            if not current_user or not db:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Internal error: Missing user or database session"
-                )
+            current_user, db = _get_user_and_db(kwargs, current_user_param, db_param)
             
             # Check plan level
-            access_service = get_user_access_service(current_user.id, db)
-            current_plan = access_service.get_plan_name()
-            
-            current_level = plan_hierarchy.get(current_plan, 0)
-            required_level = plan_hierarchy.get(required_plan, 0)
-            
-            if current_level < required_level:
-                default_message = f"This feature requires {required_plan.title()} plan or higher. Current plan: {access_service.get_plan_display_name()}"
-                message = error_message or default_message
-                
-                raise HTTPException(
-                    status_code=403,
-                    detail={
-                        "error": "plan_upgrade_required",
-                        "message": message,
-                        "current_plan": current_plan,
-                        "required_plan": required_plan,
-                        "upgrade_required": True
-                    }
-                )
+            access_service = _get_cached_access_service(current_user, db)
+            _check_plan(access_service, required_plan, required_level, error_message)
             
             return await func(*args, **kwargs)
         return wrapper
     return decorator
 
 
-def check_usage_limit(limit_type: str, count: int = 1, error_message: Optional[str] = None):
+# Limit types mapped to the access service check, called as check(access_service, count)
+LIMIT_CHECKS = {
+    'campaigns': lambda access_service, count: access_service.can_create_campaign(),
+    'templates': lambda access_service, count: access_service.can_create_template(),
+    'emails': lambda access_service, count: access_service.can_send_monthly_emails(count),
+    'contacts': lambda access_service, count: access_service.can_add_contacts(count),
+    'recipients': lambda access_service, count: access_service.can_send_to_recipients(count)
+}
+
+
+def check_usage_limit(
+    limit_type: str,
+    count: int = 1,
+    error_message: Optional[str] = None,
+    current_user_param: str = "current_user",
+    db_param: str = "db"
+):
     """
     Decorator to check usage limits before executing endpoint.
     
@@ -128,45 +199,25 @@ def check_usage_limit(limit_type: str, count: int = 1, error_message: Optional[s
         limit_type: Type of limit to check ('campaigns', 'recipients', 'emails', 'templates', 'contacts')
         count: Number of units to check against the limit
         error_message: Custom error message if limit is exceeded
+        current_user_param: Name of the endpoint's authenticated user parameter
+        db_param: Name of the endpoint's database session parameter
     """
+    limit_check = LIMIT_CHECKS.get(limit_type)
+    
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Extract current_user and db from the function arguments/kwargs
-            current_user = None
-            db = None
-            
-            for key, value in kwargs.items():
-                if isinstance(value, User):
-                    current_user = value
-                elif hasattr(value, 'query'):  # SQLAlchemy Session
-                    db = value
-            
-            if not current_user or not db:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Internal error: Missing user or database session"
-                )
-            
-            # Check usage limit
-            access_service = get_user_access_service(current_user.id, db)
+            current_user, db = _get_user_and_db(kwargs, current_user_param, db_param)
             
-            # Map limit types to service methods
-            limit_checks = {
-                'campaigns': access_service.can_create_campaign,
-                'templates': access_service.can_create_template,
-                'emails': lambda: access_service.can_send_monthly_emails(count),
-                'contacts': lambda: access_service.can_add_contacts(count),
-                'recipients': lambda: access_service.can_send_to_recipients(count)
-            }
-            
-            if limit_type not in limit_checks:
+            if limit_check is None:
                 raise HTTPException(
                     status_code=500,
                     detail=f"Unknown limit type: {limit_type}"
                 )
             
-            can_proceed = limit_checks[limit_type]()
+            # Check usage limit
+            access_service = _get_cached_access_service(current_user, db)
+            can_proceed = limit_check(access_service, count)
             
             if not can_proceed:
                 usage_stats = access_service.get_usage_stats()
@@ -196,13 +247,65 @@ def check_usage_limit(limit_type: str, count: int = 1, error_message: Optional[s
     return decorator
 
 
-def track_usage(feature_name: str, count: int = 1):
+# Feature names mapped to the access service tracker, called as track(access_service, count);
+# anything else is written as a generic usage log entry
+USAGE_TRACKERS = {
+    'campaign_create': lambda access_service, count: access_service.track_campaign_creation(),
+    'email_send': lambda access_service, count: access_service.track_email_sent(count),
+    'template_create': lambda access_service, count: access_service.track_template_creation(),
+    'contact_add': lambda access_service, count: access_service.track_contact_addition(count)
+}
+
+# Usage is recorded after the response is returned; past this many pending
+# writes the request waits for its own write instead of piling up more
+MAX_PENDING_USAGE_WRITES = 1000
+_usage_tasks: Set[asyncio.Task] = set()
+
+
+def _record_usage(user_id: str, feature_name: str, count: int) -> None:
+    """Write one usage event with its own session (the request's session is gone by now)"""
+    db = SessionLocal()
+    try:
+        access_service = get_user_access_service(user_id, db)
+        tracker = USAGE_TRACKERS.get(feature_name)
+        if tracker is not None:
+            tracker(access_service, count)
+        else:
+            # Generic usage logging
+            access_service._log_usage(feature_name, count)
+    finally:
+        db.close()
+
+
+def _usage_task_done(task: asyncio.Task) -> None:
+    _usage_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Failed to track usage: %s", task.exception())
+
+
+async def wait_for_usage_tracking() -> None:
+    """Wait for pending usage writes (called on shutdown)"""
+    if _usage_tasks:
+        await asyncio.gather(*_usage_tasks, return_exceptions=True)
+
+
+def track_usage(
+    feature_name: str,
+    count: int = 1,
+    current_user_param: str = "current_user"
+):
     """
     Decorator to track feature usage after successful endpoint execution.
     
+    Counters checked by plan limits (USAGE_TRACKERS) are written before the
+    response is returned, so the user's next request already sees them;
+    other usage is logged in the background. Failures are logged, never
+    raised.
+    
     Args:
         feature_name: Name of the feature being used
         count: Number of units used
+        current_user_param: Name of the endpoint's authenticated user parameter
     """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
@@ -211,39 +314,20 @@ def track_usage(feature_name: str, count: int = 1):
             result = await func(*args, **kwargs)
             
             # Track usage after successful execution
-            try:
-                # Extract current_user and db from the function arguments/kwargs
-                current_user = None
-                db = None
-                
-                for key, value in kwargs.items():
-                    if isinstance(value, User):
-                        current_user = value
-                    elif hasattr(value, 'query'):  # SQLAlchemy Session
-                        db = value
-                
-                if current_user and db:
-                    access_service = get_user_access_service(current_user.id, db)
-                    
-                    # Map feature names to tracking methods
-                    tracking_methods = {
-                        'campaign_create': access_service.track_campaign_creation,
-                        'email_send': lambda: access_service.track_email_sent(count),
-                        'template_create': access_service.track_template_creation,
-                        'contact_add': lambda: access_service.track_contact_addition(count)
-                    }
-                    
-                    if feature_name in tracking_methods:
-                        tracking_methods[feature_name]()
-                    else:
-                        # Generic usage logging
-                        access_service._log_usage(feature_name, count)
-            
-            except Exception as e:
-                # Log the error but don't fail the request
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f"Failed to track usage for {feature_name}: {str(e)}")
+            current_user = kwargs.get(current_user_param)
+            if current_user and feature_name in USAGE_TRACKERS:
+                try:
+                    await asyncio.to_thread(_record_usage, current_user.id, feature_name, count)
+                except Exception as e:
+                    logger.error("Failed to track usage: %s", e)
+            elif current_user:
+                task = asyncio.create_task(
+                    asyncio.to_thread(_record_usage, current_user.id, feature_name, count)
+                )
+                _usage_tasks.add(task)
+                task.add_done_callback(_usage_task_done)
+                if len(_usage_tasks) > MAX_PENDING_USAGE_WRITES:
+                    await asyncio.wait([task])
             
             return result
         return wrapper
@@ -251,50 +335,72 @@ def track_usage(feature_name: str, count: int = 1):
 
 
 # Combined decorators for common use cases
-def require_pro_feature(feature: str, error_message: Optional[str] = None):
-    """Convenience decorator that combines plan and feature checks for Pro features"""
+def _require_plan_feature(
+    required_plan: str,
+    plan_error_message: str,
+    feature: str,
+    error_message: Optional[str] = None,
+    current_user_param: str = "current_user",
+    db_param: str = "db"
+):
+    """Single wrapper running the feature check and then the plan check against one access service"""
+    required_level = PlanLevel.from_name(required_plan)
+    
     def decorator(func: Callable) -> Callable:
-        # Apply both decorators
-        func = require_plan('pro', f"This feature requires Pro plan or higher")(func)
-        func = require_feature(feature, error_message)(func)
-        return func
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            current_user, db = _get_user_and_db(kwargs, current_user_param, db_param)
+            
+            access_service = _get_cached_access_service(current_user, db)
+            _check_feature(access_service, feature, error_message)
+            _check_plan(access_service, required_plan, required_level, plan_error_message)
+            
+            return await func(*args, **kwargs)
+        return wrapper
     return decorator
 
 
+def require_pro_feature(feature: str, error_message: Optional[str] = None):
+    """Convenience decorator that combines plan and feature checks for Pro features"""
+    return _require_plan_feature('pro', "This feature requires Pro plan or higher", feature, error_message)
+
+
 def require_enterprise_feature(feature: str, error_message: Optional[str] = None):
     """Convenience decorator that combines plan and feature checks for Enterprise features"""
-    def decorator(func: Callable) -> Callable:
-        # Apply both decorators
-        func = require_plan('enterprise', f"This feature requires Enterprise plan")(func)
-        func = require_feature(feature, error_message)(func)
-        return func
-    return decorator
+    return _require_plan_feature('enterprise', "This feature requires Enterprise plan", feature, error_message)
 
 
 # Middleware functions for FastAPI dependencies
 async def get_feature_access_service(
-    current_user: User = Depends(),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """FastAPI dependency to get FeatureAccessService"""
-    return get_user_access_service(current_user.id, db)
+    """
+    FastAPI dependency to get FeatureAccessService
+    
+    FastAPI caches it per request, so any number of checker dependencies on
+    one route share a single user lookup and access service. Both
+    sub-dependencies are async, so resolving it never hops to the threadpool,
+    and the session is the one the user was loaded with.
+    """
+    return _get_cached_access_service(current_user, db)
 
 
-def create_feature_checker(feature: str):
-    """Factory function to create feature-checking dependencies"""
+def create_feature_checker(feature: str, error_message: Optional[str] = None):
+    """
+    Factory function to create feature-checking dependencies
+    
+    Usage: @router.get(..., dependencies=[Depends(create_feature_checker('ab_testing'))])
+    """
+    message = error_message or "This feature requires a higher subscription tier"
+    
     async def check_feature_access(
         access_service = Depends(get_feature_access_service)
     ):
         if not access_service.has_feature(feature):
             raise HTTPException(
                 status_code=403,
-                detail={
-                    "error": "feature_access_denied",
-                    "message": f"This feature requires a higher subscription tier",
-                    "required_feature": feature,
-                    "current_plan": access_service.get_plan_display_name(),
-                    "upgrade_required": True
-                }
+                detail=_feature_denied_detail(feature, access_service.get_plan_display_name(), message)
             )
         return True
     
@@ -303,25 +409,21 @@ def create_feature_checker(feature: str):
 
 def create_plan_checker(required_plan: str):
     """Factory function to create plan-checking dependencies"""
-    plan_hierarchy = {'free': 0, 'pro': 1, 'enterprise': 2}
+    required_level = PlanLevel.from_name(required_plan)
+    message = f"This feature requires {required_plan.title()} plan or higher"
     
     async def check_plan_access(
         access_service = Depends(get_feature_access_service)
     ):
-        current_plan = access_service.get_plan_name()
-        current_level = plan_hierarchy.get(current_plan, 0)
-        required_level = plan_hierarchy.get(required_plan, 0)
-        
-        if current_level < required_level:
+        if access_service.plan_level < required_level:
             raise HTTPException(
                 status_code=403,
-                detail={
-                    "error": "plan_upgrade_required",
-                    "message": f"This feature requires {required_plan.title()} plan or higher",
-                    "current_plan": current_plan,
-                    "required_plan": required_plan,
-                    "upgrade_required": True
-                }
+                detail=_plan_required_detail(
+                    required_plan,
+                    access_service.get_plan_name(),
+                    access_service.get_plan_display_name(),
+                    message
+                )
             )
         return True
     
@@ -334,3 +436,4 @@ require_enterprise_plan = create_plan_checker('enterprise')
 require_ab_testing = create_feature_checker('ab_testing')
 require_segmentation = create_feature_checker('segmentation')
 require_ai_features = create_feature_checker('ai_content_generation')
+require_recurring_campaigns = create_feature_checker('recurring_campaigns')
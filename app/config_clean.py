@@ -0,0 +1,133 @@
+"""
+Application settings loaded from the environment (and .env) once, on first use
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, FrozenSet, Mapping, Optional, Tuple
+
+from dotenv import load_dotenv
+
+
+# The project's .env, next to the app package
+DOTENV_PATH = Path(__file__).resolve().parent.parent / ".env"
+
+_TRUTHY = frozenset(("true", "1", "yes", "on", "y", "t"))
+
+
+# Browser origins allowed to call the API when CORS_ORIGINS is not set
+DEFAULT_CORS_ORIGINS = frozenset((
+    "https://mail-tantra.marvonix.com",
+    "https://mail-tantra.marvonix.com/",
+    "http://localhost:3000",
+    "https://emailtrackerapi.marvonix.com",
+))
+
+
+def _parse_bool(value: str) -> bool:
+    return value.lower() in _TRUTHY
+
+
+def _parse_origins(value: str) -> FrozenSet[str]:
+    """CORS_ORIGINS as a JSON list or a comma-separated string"""
+    origins = json.loads(value) if value.lstrip().startswith("[") else value.split(",")
+    return frozenset(origin.strip() for origin in origins if origin.strip())
+
+
+@dataclass(slots=True, frozen=True)
+class Settings:
+    """Resolved configuration values; immutable, so one instance is shared process-wide"""
+
+    # Database
+    database_url: str = "sqlite:///./email_tracker.db"
+    redis_url: Optional[str] = None
+    # Connection pools for non-SQLite databases, per process; the defaults
+    # are SQLAlchemy's own, so raise them only within the server's
+    # max_connections divided by the number of worker processes
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    async_db_pool_size: int = 5
+    async_db_max_overflow: int = 10
+
+    # JWT
+    secret_key: str = field(default="your-secret-key-change-in-production", repr=False)
+    algorithm: str = "HS256"
+    access_token_expire_minutes: int = 30
+    refresh_token_expire_days: int = 7
+
+    # Email delivery
+    smtp_server: str = "smtp.gmail.com"
+    smtp_port: int = 587
+    smtp_username: Optional[str] = None
+    smtp_password: Optional[str] = field(default=None, repr=False)
+    verify_ssl: bool = True
+
+    # Public URL used in tracking links, and the default sender name;
+    # callers apply their own fallbacks when these are unset
+    base_url: Optional[str] = None
+    sender_name: Optional[str] = None
+
+    # ip-api.com Pro key for batch geolocation over HTTPS; without one,
+    # lookups go to the keyless HTTPS providers only
+    ip_api_key: Optional[str] = field(default=None, repr=False)
+
+    # A frozenset so the CORS middleware's per-request membership test is O(1)
+    cors_origins: FrozenSet[str] = DEFAULT_CORS_ORIGINS
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os.environ) -> "Settings":
+        """Build settings from the environment; unset variables keep the field defaults"""
+        values = {}
+        for field_name, variable, parse in _ENV_FIELDS:
+            raw = env.get(variable)
+            if raw is not None:
+                values[field_name] = parse(raw)
+        return cls(**values)
+
+
+# Settings field -> (environment variable, parser); each variable is read once
+_ENV_FIELDS: Tuple[Tuple[str, str, Callable[[str], Any]], ...] = (
+    ("database_url", "DATABASE_URL", str),
+    ("redis_url", "REDIS_URL", str),
+    ("db_pool_size", "DB_POOL_SIZE", int),
+    ("db_max_overflow", "DB_MAX_OVERFLOW", int),
+    ("async_db_pool_size", "ASYNC_DB_POOL_SIZE", int),
+    ("async_db_max_overflow", "ASYNC_DB_MAX_OVERFLOW", int),
+    ("secret_key", "SECRET_KEY", str),
+    ("algorithm", "ALGORITHM", str),
+    ("access_token_expire_minutes", "ACCESS_TOKEN_EXPIRE_MINUTES", int),
+    ("refresh_token_expire_days", "REFRESH_TOKEN_EXPIRE_DAYS", int),
+    ("smtp_server", "SMTP_SERVER", str),
+    ("smtp_port", "SMTP_PORT", int),
+    ("smtp_username", "SMTP_USERNAME", str),
+    ("smtp_password", "SMTP_PASSWORD", str),
+    ("verify_ssl", "VERIFY_SSL", _parse_bool),
+    ("base_url", "BASE_URL", str),
+    ("sender_name", "SENDER_NAME", str),
+    ("ip_api_key", "IP_API_KEY", str),
+    ("cors_origins", "CORS_ORIGINS", _parse_origins),
+)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide settings, loading .env and the environment on first use
+
+    Modules take their configuration from here instead of calling os.getenv
+    themselves, so nothing is read until something actually needs it.
+    """
+    # Loaded by path rather than through find_dotenv()'s walk up the
+    # directory tree; a missing file is simply skipped
+    if DOTENV_PATH.is_file():
+        load_dotenv(DOTENV_PATH)
+    return Settings.from_env()
+
+
+def __getattr__(name: str) -> Any:
+    # `from app.config_clean import settings` resolves lazily to get_settings()
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,11 +6,140 @@ Prevents datetime_parsing errors by normalizing input formats.
 """
 
 from datetime import datetime, date, time, timezone
+from functools import lru_cache
 from typing import Any, Optional, Union
 from pydantic import field_validator
 import re
 
 
+_DATE_ONLY_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})', re.ASCII)
+
+# Shapes of the other accepted formats, so each string is matched once
+# instead of attempting strptime with every format in turn. re.ASCII keeps
+# \d to 0-9 as strptime did; otherwise e.g. Arabic-Indic digits would match
+# and int() would quietly convert them
+_YMD_HMS_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2}) (\d{1,2}):(\d{1,2})(?::(\d{1,2}))?', re.ASCII)
+_SLASH_DMY_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})', re.ASCII)
+_DASH_DMY_RE = re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})', re.ASCII)
+_SLASH_YMD_RE = re.compile(r'(\d{4})/(\d{1,2})/(\d{1,2})', re.ASCII)
+
+
+@lru_cache(maxsize=1024)
+def _parse_datetime_string(v: str) -> datetime:
+    """
+    Parse a stripped, non-empty datetime string to a UTC-aware datetime.
+    
+    Cached because imports and schedules repeat the same timestamps; the
+    returned datetimes are immutable, so sharing them is safe.
+    """
+    # Try ISO format first (most common)
+    if 'T' in v:
+        # Has time component
+        dt = datetime.fromisoformat(v.replace('Z', '+00:00'))
+        # Ensure UTC
+        if dt.tzinfo is None:
+            return dt.replace(tzinfo=timezone.utc)
+        return dt if dt.tzinfo is timezone.utc else dt.astimezone(timezone.utc)
+        
+    # Date-only format (YYYY-MM-DD)
+    match = _DATE_ONLY_RE.fullmatch(v)
+    if match:
+        # Built directly at UTC midnight; no strptime, no replace()
+        year, month, day = match.groups()
+        return datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
+        
+    # YYYY-MM-DD HH:MM[:SS]
+    match = _YMD_HMS_RE.fullmatch(v)
+    if match:
+        year, month, day, hour, minute, second = match.groups()
+        return datetime(
+            int(year), int(month), int(day), int(hour), int(minute), int(second or 0),
+            tzinfo=timezone.utc
+        )
+        
+    # DD/MM/YYYY, falling back to MM/DD/YYYY when that is not a valid date
+    match = _SLASH_DMY_RE.fullmatch(v)
+    if match:
+        first, second, year = (int(part) for part in match.groups())
+        try:
+            return datetime(year, second, first, tzinfo=timezone.utc)
+        except ValueError:
+            return datetime(year, first, second, tzinfo=timezone.utc)
+            
+    # DD-MM-YYYY
+    match = _DASH_DMY_RE.fullmatch(v)
+    if match:
+        day, month, year = match.groups()
+        return datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
+        
+    # YYYY/MM/DD
+    match = _SLASH_YMD_RE.fullmatch(v)
+    if match:
+        year, month, day = match.groups()
+        return datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
+        
+    # Last resort: try fromisoformat with cleanup
+    v_clean = v.replace(' ', 'T')
+    if not v_clean.endswith('Z') and '+' not in v_clean and 'T' in v_clean:
+        v_clean += 'Z'
+    dt = datetime.fromisoformat(v_clean.replace('Z', '+00:00'))
+    return dt.astimezone(timezone.utc)
+
+
+def normalize_datetime(v: Any) -> Optional[datetime]:
+    """
+    Normalizes datetime inputs to datetime objects.
+    
+    Handles:
+    - ISO datetime strings (2025-08-24T10:00:00Z)
+    - Date-only strings (2025-08-24)
+    - Date objects
+    - Datetime objects
+    - None values
+    
+    Args:
+        v: Input value to normalize
+        
+    Returns:
+        Normalized datetime object or None
+        
+    Raises:
+        ValueError: If input cannot be parsed as a valid datetime
+    """
+    if v is None:
+        return None
+        
+    # Already a datetime object
+    if isinstance(v, datetime):
+        # Ensure timezone is set (convert to UTC if naive); already-UTC values are returned as-is
+        if v.tzinfo is None:
+            return v.replace(tzinfo=timezone.utc)
+        if v.tzinfo is timezone.utc:
+            return v
+        return v.astimezone(timezone.utc)
+        
+    # Date object without time
+    if isinstance(v, date) and not isinstance(v, datetime):
+        # Convert to datetime at midnight UTC
+        return datetime.combine(v, time.min, tzinfo=timezone.utc)
+        
+    # String input
+    if isinstance(v, str):
+        v = v.strip()
+        
+        # Empty string
+        if not v:
+            return None
+            
+        try:
+            return _parse_datetime_string(v)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Unable to parse datetime: '{v}'. Expected ISO format (YYYY-MM-DDTHH:MM:SSZ) or date format (YYYY-MM-DD). Error: {e}")
+            
+    # Unsupported type
+    raise ValueError(f"Unsupported datetime type: {type(v)}. Expected string, date, or datetime object.")
+
+
 class DateTimeValidatorMixin:
     """
     Mixin class providing consistent datetime validation for Pydantic models.
@@ -24,90 +153,8 @@ class DateTimeValidatorMixin:
     @field_validator('start_date', 'end_date', 'created_at', 'updated_at', 'scheduled_at', mode='before')
     @classmethod
     def normalize_datetime_fields(cls, v: Any) -> Optional[datetime]:
-        """
-        Normalizes datetime inputs to datetime objects.
-        
-        Handles:
-        - ISO datetime strings (2025-08-24T10:00:00Z)
-        - Date-only strings (2025-08-24)
-        - Date objects
-        - Datetime objects
-        - None values
-        
-        Args:
-            v: Input value to normalize
-            
-        Returns:
-            Normalized datetime object or None
-            
-        Raises:
-            ValueError: If input cannot be parsed as a valid datetime
-        """
-        if v is None:
-            return None
-            
-        # Already a datetime object
-        if isinstance(v, datetime):
-            # Ensure timezone is set (convert to UTC if naive)
-            if v.tzinfo is None:
-                return v.replace(tzinfo=timezone.utc)
-            return v.astimezone(timezone.utc)
-            
-        # Date object without time
-        if isinstance(v, date) and not isinstance(v, datetime):
-            # Convert to datetime at midnight UTC
-            return datetime.combine(v, time.min, tzinfo=timezone.utc)
-            
-        # String input
-        if isinstance(v, str):
-            v = v.strip()
-            
-            # Empty string
-            if not v:
-                return None
-                
-            try:
-                # Try ISO format first (most common)
-                if 'T' in v:
-                    # Has time component
-                    dt = datetime.fromisoformat(v.replace('Z', '+00:00'))
-                    # Ensure UTC
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    return dt.astimezone(timezone.utc)
-                    
-                # Date-only format (YYYY-MM-DD)
-                elif re.match(r'^\d{4}-\d{2}-\d{2}$', v):
-                    dt = datetime.strptime(v, '%Y-%m-%d')
-                    return dt.replace(tzinfo=timezone.utc)
-                    
-                # Try other common formats
-                for fmt in [
-                    '%Y-%m-%d %H:%M:%S',
-                    '%Y-%m-%d %H:%M',
-                    '%d/%m/%Y',
-                    '%m/%d/%Y',
-                    '%d-%m-%Y',
-                    '%Y/%m/%d'
-                ]:
-                    try:
-                        dt = datetime.strptime(v, fmt)
-                        return dt.replace(tzinfo=timezone.utc)
-                    except ValueError:
-                        continue
-                        
-                # Last resort: try fromisoformat with cleanup
-                v_clean = v.replace(' ', 'T')
-                if not v_clean.endswith('Z') and '+' not in v_clean and 'T' in v_clean:
-                    v_clean += 'Z'
-                dt = datetime.fromisoformat(v_clean.replace('Z', '+00:00'))
-                return dt.astimezone(timezone.utc)
-                
-            except (ValueError, TypeError) as e:
-                raise ValueError(f"Unable to parse datetime: '{v}'. Expected ISO format (YYYY-MM-DDTHH:MM:SSZ) or date format (YYYY-MM-DD). Error: {e}")
-                
-        # Unsupported type
-        raise ValueError(f"Unsupported datetime type: {type(v)}. Expected string, date, or datetime object.")
+        """Normalizes datetime inputs to UTC-aware datetime objects (see normalize_datetime)"""
+        return normalize_datetime(v)
 
 
 def normalize_to_utc_aware(dt: Union[datetime, str]) -> datetime:
@@ -124,15 +171,13 @@ def normalize_to_utc_aware(dt: Union[datetime, str]) -> datetime:
         ValueError: If input cannot be parsed
     """
     if isinstance(dt, str):
-        # Use the mixin's normalization logic
-        validator = DateTimeValidatorMixin()
-        return validator.normalize_datetime_fields(dt)
+        return normalize_datetime(dt)
     elif isinstance(dt, datetime):
         # If naive, assume UTC
         if dt.tzinfo is None:
             return dt.replace(tzinfo=timezone.utc)
-        # If aware, convert to UTC
-        return dt.astimezone(timezone.utc)
+        # If aware, convert to UTC (nothing to do when it already is)
+        return dt if dt.tzinfo is timezone.utc else dt.astimezone(timezone.utc)
     else:
         raise ValueError(f"Unsupported type for datetime normalization: {type(dt)}")
 
@@ -201,6 +246,37 @@ def validate_datetime_range(
     return start, end
 
 
+def _validate_weekly(config: dict) -> None:
+    if not config.get('days_of_week'):
+        raise ValueError("Weekly frequency requires 'days_of_week' to be specified")
+
+
+def _validate_monthly(config: dict) -> None:
+    monthly_type = config.get('monthly_type', 'day_of_month')
+    if monthly_type == 'day_of_month':
+        day_of_month = config.get('day_of_month')
+        if not day_of_month or not (1 <= day_of_month <= 31):
+            raise ValueError("Monthly day_of_month frequency requires 'day_of_month' between 1-31")
+    elif monthly_type == 'nth_weekday':
+        if not config.get('week_number') or not config.get('weekday'):
+            raise ValueError("Monthly nth_weekday frequency requires 'week_number' and 'weekday'")
+
+
+def _validate_custom(config: dict) -> None:
+    if not config.get('custom_rrule'):
+        raise ValueError("Custom frequency requires 'custom_rrule' to be specified")
+
+
+# Frequency-specific checks for validate_schedule_config, looked up once
+# per schedule instead of walking an if/elif chain; unknown frequencies
+# have no extra requirements
+_FREQ_VALIDATORS = {
+    'weekly': _validate_weekly,
+    'monthly': _validate_monthly,
+    'custom': _validate_custom,
+}
+
+
 class RecurringScheduleValidator:
     """
     Specialized validator for recurring schedule configurations.
@@ -220,16 +296,14 @@ class RecurringScheduleValidator:
         Raises:
             ValueError: If configuration is invalid
         """
-        normalized = config.copy()
+        normalized = {**config}
         
         # Normalize datetime fields
         if 'start_date' in normalized:
-            dt_validator = DateTimeValidatorMixin()
-            normalized['start_date'] = dt_validator.normalize_datetime_fields(normalized['start_date'])
+            normalized['start_date'] = normalize_datetime(normalized['start_date'])
             
         if 'end_date' in normalized:
-            dt_validator = DateTimeValidatorMixin()
-            normalized['end_date'] = dt_validator.normalize_datetime_fields(normalized['end_date'])
+            normalized['end_date'] = normalize_datetime(normalized['end_date'])
             
         # Validate future datetime
         if normalized.get('start_date'):
@@ -239,25 +313,11 @@ class RecurringScheduleValidator:
         if normalized.get('start_date') and normalized.get('end_date'):
             validate_datetime_range(normalized['start_date'], normalized['end_date'])
             
-        # Validate frequency-specific requirements
-        frequency = normalized.get('frequency', 'weekly')
-        
-        if frequency == 'weekly':
-            if not normalized.get('days_of_week'):
-                raise ValueError("Weekly frequency requires 'days_of_week' to be specified")
-                
-        elif frequency == 'monthly':
-            monthly_type = normalized.get('monthly_type', 'day_of_month')
-            if monthly_type == 'day_of_month':
-                day_of_month = normalized.get('day_of_month')
-                if not day_of_month or not (1 <= day_of_month <= 31):
-                    raise ValueError("Monthly day_of_month frequency requires 'day_of_month' between 1-31")
-            elif monthly_type == 'nth_weekday':
-                if not normalized.get('week_number') or not normalized.get('weekday'):
-                    raise ValueError("Monthly nth_weekday frequency requires 'week_number' and 'weekday'")
-                    
-        elif frequency == 'custom':
-            if not normalized.get('custom_rrule'):
-                raise ValueError("Custom frequency requires 'custom_rrule' to be specified")
+        # Validate frequency-specific requirements; frequencies without an
+        # entry (daily, biweekly, unknown values) pass unchecked, as they
+        # did with the if/elif chain
+        validator = _FREQ_VALIDATORS.get(normalized.get('frequency', 'weekly'))
+        if validator:
+            validator(normalized)
                 
         return normalized
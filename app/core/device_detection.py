@@ -1,29 +1,69 @@
 """
 Device detection and IP geolocation utilities
 """
+import asyncio
+import ipaddress
+import logging
 import re
-import requests
-from typing import Dict, Any, Optional, Tuple
+import time
+import httpx
+from functools import lru_cache
+from types import MappingProxyType
+from datetime import datetime
+from typing import AbstractSet, Dict, Any, Iterable, List, Mapping, Optional, Tuple, Union
 from user_agents import parse as parse_user_agent
-import json
+import orjson
 
+from .cache import TTLCache, MISSING
+from ..db import SessionLocal
+from ..config_clean import settings
+from ..database.security_models import IpLocation
 
-def parse_device_info(user_agent: str) -> Dict[str, Any]:
-    """Parse user agent string to extract device information"""
+
+logger = logging.getLogger(__name__)
+
+
+# Fields that identify "the same device" for is_same_device()
+DEVICE_FINGERPRINT_FIELDS = ("browser_name", "browser_version", "os_name", "os_version", "device_type")
+
+
+def device_fingerprint(device_info: Mapping[str, Any]) -> Tuple:
+    """
+    Hashable identity of a device, for equality checks and set membership
+    
+    Parsed results carry it precomputed under "fingerprint". It is a tuple
+    rather than an integer hash so two different devices can never collide.
+    """
+    fingerprint = device_info.get("fingerprint")
+    if fingerprint is None:
+        fingerprint = tuple(device_info.get(field) for field in DEVICE_FINGERPRINT_FIELDS)
+    return fingerprint
+
+
+def _with_fingerprint(device_info: Dict[str, Any]) -> Mapping[str, Any]:
+    device_info["fingerprint"] = device_fingerprint(device_info)
+    return MappingProxyType(device_info)
+
+
+# Returned for empty or unparseable user agents; read-only because it is shared
+UNKNOWN_DEVICE: Mapping[str, Any] = _with_fingerprint({
+    "device_type": "Unknown",
+    "device_brand": "Unknown",
+    "device_model": "Unknown",
+    "browser_name": "Unknown Browser",
+    "browser_version": "Unknown",
+    "os_name": "Unknown OS",
+    "os_version": "Unknown",
+    "is_mobile": False,
+    "is_tablet": False,
+    "is_desktop": False,
+    "is_bot": False
+})
+
+
+def _parse_device_info_uncached(user_agent: str) -> Mapping[str, Any]:
     if not user_agent:
-        return {
-            "device_type": "Unknown",
-            "device_brand": "Unknown",
-            "device_model": "Unknown",
-            "browser_name": "Unknown Browser",
-            "browser_version": "Unknown",
-            "os_name": "Unknown OS",
-            "os_version": "Unknown",
-            "is_mobile": False,
-            "is_tablet": False,
-            "is_desktop": False,
-            "is_bot": False
-        }
+        return UNKNOWN_DEVICE
     
     try:
         ua = parse_user_agent(user_agent)
@@ -37,7 +77,7 @@ def parse_device_info(user_agent: str) -> Dict[str, Any]:
         elif ua.is_bot:
             device_type = "Bot"
         
-        return {
+        return _with_fingerprint({
             "device_type": device_type,
             "device_brand": ua.device.brand or "Unknown",
             "device_model": ua.device.model or "Unknown",
@@ -49,21 +89,21 @@ def parse_device_info(user_agent: str) -> Dict[str, Any]:
             "is_tablet": ua.is_tablet,
             "is_desktop": not (ua.is_mobile or ua.is_tablet or ua.is_bot),
             "is_bot": ua.is_bot
-        }
+        })
     except Exception:
-        return {
-            "device_type": "Unknown",
-            "device_brand": "Unknown",
-            "device_model": "Unknown",
-            "browser_name": "Unknown Browser",
-            "browser_version": "Unknown",
-            "os_name": "Unknown OS",
-            "os_version": "Unknown",
-            "is_mobile": False,
-            "is_tablet": False,
-            "is_desktop": False,
-            "is_bot": False
-        }
+        return UNKNOWN_DEVICE
+
+
+@lru_cache(maxsize=4096)
+def parse_device_info(user_agent: str) -> Mapping[str, Any]:
+    """
+    Parse user agent string to extract device information
+    
+    User-agent parsing is regex-heavy and real traffic repeats the same few
+    strings, so results are cached. The returned mapping is read-only and
+    shared between callers; copy it with dict() before modifying.
+    """
+    return _parse_device_info_uncached(user_agent)
 
 
 def get_device_display_name(device_info: Dict[str, Any]) -> str:
@@ -104,39 +144,88 @@ def get_device_display_name(device_info: Dict[str, Any]) -> str:
         return "Unknown Device"
 
 
-def get_location_from_ip(ip_address: str) -> Optional[str]:
-    """Get approximate location from IP address using ipapi.co (free tier)"""
-    if not ip_address or ip_address in ["127.0.0.1", "localhost", "::1"]:
-        return "Local"
-    
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+LOCAL_ADDRESSES = frozenset(("127.0.0.1", "localhost", "::1"))
+
+# ip-api.com's keyed (Pro) endpoint resolves up to 100 addresses per POST,
+# in request order. The free endpoint is plain HTTP and licensed for
+# non-commercial use only, so ip-api.com is used only when a key is set
+IP_API_BATCH_URL = "https://pro.ip-api.com/batch"
+IP_API_BATCH_SIZE = 100
+IP_API_FIELDS = "status,country,regionName,city"
+IP_API_KEY = settings.ip_api_key
+
+# Used one address at a time without an ip-api.com key, or while ip-api.com
+# is rate limiting or timing out
+IP2LOCATION_URL = "https://api.ip2location.io/"
+FAILOVER_COOLDOWN = 60.0
+
+# Resolved locations are kept for a day, addresses with no answer for an hour
+LOCATION_TTL = 24 * 60 * 60
+NEGATIVE_LOCATION_TTL = 60 * 60
+_location_cache = TTLCache(maxsize=50_000, ttl=LOCATION_TTL)
+
+# Shared client so lookups reuse keep-alive connections instead of paying
+# a TCP/TLS handshake each, and never block the event loop
+_geo_client: Optional[httpx.AsyncClient] = None
+
+
+# monotonic time until which ip-api.com is skipped in favour of the failover
+_ip_api_blocked_until = 0.0
+
+
+def _format_location(city: Optional[str], region: Optional[str], country: Optional[str]) -> Optional[str]:
+    if city and country:
+        if region and region != city:
+            return f"{city}, {region}, {country}"
+        else:
+            return f"{city}, {country}"
+    elif country:
+        return country
+    else:
+        return None
+
+
+def get_geo_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client used for geolocation lookups"""
+    global _geo_client
+    if _geo_client is None or _geo_client.is_closed:
+        _geo_client = httpx.AsyncClient(
+            timeout=3.0,
+            headers={"User-Agent": "EmailTracker/1.0"},
+            # Retries only failed connects; HTTP 429/5xx are handled by the
+            # failover logic rather than re-sent to the same provider
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                limits=httpx.Limits(max_keepalive_connections=20)
+            )
+        )
+    return _geo_client
+
+
+async def close_geo_client() -> None:
+    """Close the shared geolocation HTTP client (called on app shutdown)"""
+    global _geo_client
+    if _geo_client is not None:
+        await _geo_client.aclose()
+        _geo_client = None
+
+
+async def _lookup_location(ip_address: str) -> Optional[str]:
+    """Single-address lookup against ipapi.co (free tier)"""
     try:
         # Use ipapi.co free service (1000 requests/month)
-        response = requests.get(
-            f"https://ipapi.co/{ip_address}/json/",
-            timeout=3,
-            headers={"User-Agent": "EmailTracker/1.0"}
-        )
+        response = await get_geo_client().get(f"https://ipapi.co/{ip_address}/json/")
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Check for errors
             if data.get("error"):
                 return None
             
-            city = data.get("city")
-            region = data.get("region")
-            country = data.get("country_name")
-            
-            if city and country:
-                if region and region != city:
-                    return f"{city}, {region}, {country}"
-                else:
-                    return f"{city}, {country}"
-            elif country:
-                return country
-            else:
-                return None
+            return _format_location(data.get("city"), data.get("region"), data.get("country_name"))
         
     except Exception:
         pass
@@ -144,38 +233,219 @@ def get_location_from_ip(ip_address: str) -> Optional[str]:
     return None
 
 
+async def _lookup_location_failover(ip_address: str) -> Any:
+    """Single-address lookup against ip2location.io; MISSING if it did not answer"""
+    try:
+        response = await get_geo_client().get(IP2LOCATION_URL, params={"ip": ip_address})
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            return _format_location(
+                data.get("city_name"), data.get("region_name"), data.get("country_name")
+            )
+    except Exception:
+        pass
+    
+    return MISSING
+
+
+async def _fetch_locations_failover(ip_addresses: List[str], fetched: Dict[str, Optional[str]]) -> None:
+    for ip_address in ip_addresses:
+        location = await _lookup_location_failover(ip_address)
+        if location is not MISSING:
+            fetched[ip_address] = location
+
+
+async def _fetch_locations(ip_addresses: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Resolve addresses over HTTPS; only addresses the service actually answered
+    for are returned, so network errors are never cached as "no location"
+    
+    With an ip-api.com key, addresses go to its batch endpoint; a 429 or
+    timeout switches to ip2location.io for FAILOVER_COOLDOWN seconds.
+    Without a key every address is looked up on ip2location.io.
+    """
+    global _ip_api_blocked_until
+    fetched: Dict[str, Optional[str]] = {}
+    if not IP_API_KEY:
+        await _fetch_locations_failover(ip_addresses, fetched)
+        return fetched
+    
+    for i in range(0, len(ip_addresses), IP_API_BATCH_SIZE):
+        batch = ip_addresses[i:i + IP_API_BATCH_SIZE]
+        
+        if time.monotonic() < _ip_api_blocked_until:
+            await _fetch_locations_failover(batch, fetched)
+            continue
+        
+        try:
+            response = await get_geo_client().post(
+                IP_API_BATCH_URL,
+                params={"fields": IP_API_FIELDS, "key": IP_API_KEY},
+                json=batch
+            )
+            
+            if response.status_code == 429:
+                _ip_api_blocked_until = time.monotonic() + FAILOVER_COOLDOWN
+                await _fetch_locations_failover(batch, fetched)
+                continue
+            
+            if 400 <= response.status_code < 500:
+                for ip_address in batch:
+                    fetched[ip_address] = await _lookup_location(ip_address)
+                continue
+            
+            if response.status_code == 200:
+                for ip_address, data in zip(batch, orjson.loads(response.content)):
+                    if data.get("status") == "success":
+                        fetched[ip_address] = _format_location(
+                            data.get("city"), data.get("regionName"), data.get("country")
+                        )
+                    else:
+                        fetched[ip_address] = None
+        
+        except httpx.TimeoutException:
+            _ip_api_blocked_until = time.monotonic() + FAILOVER_COOLDOWN
+            await _fetch_locations_failover(batch, fetched)
+        except Exception:
+            pass
+    
+    return fetched
+
+
+def _location_ttl(location: Optional[str]) -> int:
+    return LOCATION_TTL if location else NEGATIVE_LOCATION_TTL
+
+
+# Failures of the ip_locations table (e.g. migration not applied) are
+# logged as warnings once per operation, then at debug level, since the
+# lookup still works from the in-process cache and over HTTP
+_reported_store_errors: set = set()
+
+
+def _report_store_error(operation: str, error: Exception) -> None:
+    if operation in _reported_store_errors:
+        logger.debug("Could not %s stored IP locations: %s", operation, error)
+    else:
+        _reported_store_errors.add(operation)
+        logger.warning("Could not %s stored IP locations: %s", operation, error)
+
+
+def _load_stored_locations(ip_addresses: List[str]) -> Dict[str, Optional[str]]:
+    """Unexpired lookups persisted in the ip_locations table"""
+    now = datetime.utcnow()
+    stored = {}
+    try:
+        with SessionLocal() as db:
+            rows = db.query(IpLocation).filter(IpLocation.ip_address.in_(ip_addresses)).all()
+        for row in rows:
+            ttl = _location_ttl(row.location)
+            remaining = ttl - (now - row.fetched_at).total_seconds()
+            if remaining > 0:
+                stored[row.ip_address] = row.location
+                _location_cache.set(row.ip_address, row.location, ttl=remaining)
+    except Exception as e:
+        _report_store_error("load", e)
+    return stored
+
+
+def _store_locations(locations: Dict[str, Optional[str]]) -> None:
+    now = datetime.utcnow()
+    try:
+        with SessionLocal() as db:
+            for ip_address, location in locations.items():
+                db.merge(IpLocation(ip_address=ip_address, location=location, fetched_at=now))
+            db.commit()
+    except Exception as e:
+        _report_store_error("save", e)
+
+
+async def get_locations_from_ips(ip_addresses: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Get approximate locations for many IP addresses in as few requests as possible
+    
+    Each address is answered from the in-process cache, then the ip_locations
+    table, and only then over HTTPS (see _fetch_locations). Fetched results
+    are written through to both caches, with misses kept for a shorter time.
+    
+    Returns:
+        Dictionary mapping each given address to its location (None if unknown)
+    """
+    locations: Dict[str, Optional[str]] = {}
+    pending = []
+    for ip_address in dict.fromkeys(ip_addresses):
+        if not ip_address or ip_address in LOCAL_ADDRESSES:
+            locations[ip_address] = "Local"
+            continue
+        location = _location_cache.get(ip_address, MISSING)
+        if location is MISSING:
+            locations[ip_address] = None
+            pending.append(ip_address)
+        else:
+            locations[ip_address] = location
+    
+    if pending:
+        stored = await asyncio.to_thread(_load_stored_locations, pending)
+        locations.update(stored)
+        pending = [ip_address for ip_address in pending if ip_address not in stored]
+    
+    if pending:
+        fetched = await _fetch_locations(pending)
+        for ip_address, location in fetched.items():
+            _location_cache.set(ip_address, location, ttl=_location_ttl(location))
+        if fetched:
+            await asyncio.to_thread(_store_locations, fetched)
+        locations.update(fetched)
+    
+    return locations
+
+
+async def get_location_from_ip(ip_address: str) -> Optional[str]:
+    """Get approximate location from a single IP address"""
+    return (await get_locations_from_ips((ip_address,)))[ip_address]
+
+
 def is_same_device(device_info1: Dict[str, Any], device_info2: Dict[str, Any]) -> bool:
     """Check if two device info objects represent the same device"""
     if not device_info1 or not device_info2:
         return False
     
-    # Compare key device characteristics
-    same_browser = (
-        device_info1.get("browser_name") == device_info2.get("browser_name") and
-        device_info1.get("browser_version") == device_info2.get("browser_version")
-    )
-    
-    same_os = (
-        device_info1.get("os_name") == device_info2.get("os_name") and
-        device_info1.get("os_version") == device_info2.get("os_version")
-    )
-    
-    same_device_type = device_info1.get("device_type") == device_info2.get("device_type")
-    
-    return same_browser and same_os and same_device_type
+    # Same browser, OS (both with version) and device type
+    return device_fingerprint(device_info1) == device_fingerprint(device_info2)
 
 
-def is_known_location(ip_address: str, user_previous_ips: list) -> bool:
-    """Check if an IP address is from a known location"""
-    if not ip_address or not user_previous_ips:
+def is_known_location(
+    ip_address: str,
+    user_previous_ips: Union[AbstractSet[str], Iterable[str]],
+    known_networks: Optional[Iterable[IPNetwork]] = None
+) -> bool:
+    """
+    Check if an IP address is from a known location
+    
+    Args:
+        ip_address: Address to check
+        user_previous_ips: Addresses the user has used before; pass a set
+            to make the exact-match check O(1)
+        known_networks: Optional ranges (e.g. the user's usual /24) that
+            also count as known
+    """
+    if not ip_address:
         return False
     
-    # Simple check - if exact IP was used before
-    if ip_address in user_previous_ips:
-        return True
+    # Exact IP used before
+    if user_previous_ips:
+        if not isinstance(user_previous_ips, AbstractSet):
+            user_previous_ips = set(user_previous_ips)
+        if ip_address in user_previous_ips:
+            return True
+    
+    if known_networks:
+        try:
+            address = ipaddress.ip_address(ip_address)
+        except ValueError:
+            return False
+        # Containment across IP versions is simply False
+        return any(address in network for network in known_networks)
     
-    # Could add more sophisticated location-based checking here
-    # For now, just exact IP match
     return False
 
 
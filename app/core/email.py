@@ -2,7 +2,8 @@
 Email notification service for security-related events.
 """
 import logging
-from typing import Optional, Dict, Any
+from string import Template
+from typing import Optional, Dict, Any, Tuple
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import smtplib
@@ -53,24 +54,14 @@ async def send_security_notification_email(
         logger.error(f"Failed to send security notification email: {str(e)}")
         return False
 
-def format_security_event_email(event_type: str, event_details: Dict[str, Any]) -> tuple[str, str]:
-    """
-    Format email subject and body for security events.
-    
-    Args:
-        event_type: Type of security event
-        event_details: Details about the security event
-        
-    Returns:
-        tuple: (subject, body) formatted for email
-    """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-    
-    templates = {
-        "password_change": {
-            "subject": "Password Changed - EmailTracker Security Alert",
-            "body": f"""
-Your EmailTracker account password was changed on {timestamp}.
+
+# Subject and body per security event type, parsed once; only the selected
+# template is rendered per email
+SECURITY_EMAIL_TEMPLATES: Dict[str, Tuple[str, Template]] = {
+    "password_change": (
+        "Password Changed - EmailTracker Security Alert",
+        Template("""
+Your EmailTracker account password was changed on $timestamp.
 
 If this was you, no action is required.
 
@@ -80,22 +71,22 @@ If you did not make this change, please:
 3. Review your security settings
 4. Contact support if you need assistance
 
-IP Address: {event_details.get('ip_address', 'Unknown')}
-Browser: {event_details.get('user_agent', 'Unknown')}
+IP Address: $ip_address
+Browser: $user_agent
 
 Best regards,
 EmailTracker Security Team
-            """
-        },
-        "login_alert": {
-            "subject": "New Login to Your EmailTracker Account",
-            "body": f"""
-A new login to your EmailTracker account was detected on {timestamp}.
+            """)
+    ),
+    "login_alert": (
+        "New Login to Your EmailTracker Account",
+        Template("""
+A new login to your EmailTracker account was detected on $timestamp.
 
 Login Details:
-- IP Address: {event_details.get('ip_address', 'Unknown')}
-- Browser: {event_details.get('user_agent', 'Unknown')}
-- Location: {event_details.get('location', 'Unknown')}
+- IP Address: $ip_address
+- Browser: $user_agent
+- Location: $location
 
 If this was you, no action is required.
 
@@ -107,15 +98,15 @@ If you don't recognize this login, please:
 
 Best regards,
 EmailTracker Security Team
-            """
-        },
-        "suspicious_activity": {
-            "subject": "Suspicious Activity Detected - EmailTracker Security Alert",
-            "body": f"""
-Suspicious activity was detected on your EmailTracker account on {timestamp}.
+            """)
+    ),
+    "suspicious_activity": (
+        "Suspicious Activity Detected - EmailTracker Security Alert",
+        Template("""
+Suspicious activity was detected on your EmailTracker account on $timestamp.
 
 Activity Details:
-{event_details.get('description', 'Unknown activity')}
+$description
 
 We recommend:
 1. Review your account activity
@@ -123,28 +114,50 @@ We recommend:
 3. Enable two-factor authentication
 4. Contact support if you have concerns
 
-IP Address: {event_details.get('ip_address', 'Unknown')}
-Browser: {event_details.get('user_agent', 'Unknown')}
+IP Address: $ip_address
+Browser: $user_agent
 
 Best regards,
 EmailTracker Security Team
-            """
-        }
-    }
-    
-    template = templates.get(event_type, {
-        "subject": f"Security Alert - EmailTracker",
-        "body": f"""
-A security event occurred on your EmailTracker account on {timestamp}.
+            """)
+    ),
+}
 
-Event: {event_type}
-Details: {event_details}
+DEFAULT_SECURITY_EMAIL_TEMPLATE: Tuple[str, Template] = (
+    "Security Alert - EmailTracker",
+    Template("""
+A security event occurred on your EmailTracker account on $timestamp.
+
+Event: $event_type
+Details: $event_details
 
 Please review your account and contact support if you have any concerns.
 
 Best regards,
 EmailTracker Security Team
-        """
-    })
+        """)
+)
+
+
+def format_security_event_email(event_type: str, event_details: Dict[str, Any]) -> tuple[str, str]:
+    """
+    Format email subject and body for security events.
+    
+    Args:
+        event_type: Type of security event
+        event_details: Details about the security event
+        
+    Returns:
+        tuple: (subject, body) formatted for email
+    """
+    subject, body = SECURITY_EMAIL_TEMPLATES.get(event_type, DEFAULT_SECURITY_EMAIL_TEMPLATE)
     
-    return template["subject"], template["body"]
+    return subject, body.substitute(
+        timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC"),
+        ip_address=event_details.get('ip_address', 'Unknown'),
+        user_agent=event_details.get('user_agent', 'Unknown'),
+        location=event_details.get('location', 'Unknown'),
+        description=event_details.get('description', 'Unknown activity'),
+        event_type=event_type,
+        event_details=event_details
+    )
@@ -0,0 +1,144 @@
+"""
+Logging configuration: console, rotating log files and JSON-formatted records
+"""
+import atexit
+import copy
+import logging
+import logging.config
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+
+LOG_DIR = Path("logs")
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 5
+
+# Records for the log files go through this queue and are written by a
+# listener thread, so request handlers never wait on disk I/O
+LOG_QUEUE: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_listener: Optional[QueueListener] = None
+
+# LogRecord attributes that are part of every record; anything else on a
+# record came from `extra=` and is copied into the JSON output
+_STANDARD_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", (), None))
+) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Render each record as one JSON object per line
+
+    Serialized with orjson, so messages containing quotes or newlines
+    still produce valid JSON.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_RECORD_ATTRS and key not in entry:
+                entry[key] = value
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+class LocalQueueHandler(QueueHandler):
+    """
+    QueueHandler for a listener in the same process
+
+    The stock prepare() pre-formats the record for pickling, folding any
+    traceback into the message; here the message is only merged with its
+    args, so the file handlers' JSONFormatter still sees exc_info.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+LOGGING_CONFIG: Dict[str, Any] = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "default": {
+            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        },
+        "json": {
+            "()": JSONFormatter
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "default",
+            "level": "INFO",
+        },
+        # Hands records to the listener writing logs/app.log and logs/error.log
+        "queue": {
+            "()": LocalQueueHandler,
+            "queue": LOG_QUEUE,
+            "level": "INFO",
+        },
+    },
+    "loggers": {
+        "app": {
+            "handlers": ["console", "queue"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+
+def _build_file_handlers() -> List[logging.Handler]:
+    handlers = []
+    for filename, level in (("app.log", logging.INFO), ("error.log", logging.ERROR)):
+        handler = RotatingFileHandler(
+            LOG_DIR / filename,
+            maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUP_COUNT
+        )
+        handler.setLevel(level)
+        handler.setFormatter(JSONFormatter())
+        handlers.append(handler)
+    return handlers
+
+
+def setup_logging() -> None:
+    """Apply LOGGING_CONFIG and start the background writer for the log files"""
+    global _listener
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    logging.config.dictConfig(LOGGING_CONFIG)
+    if _listener is None:
+        _listener = QueueListener(LOG_QUEUE, *_build_file_handlers(), respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Write out queued records and close the log files"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a named logger (configured once setup_logging() has run)"""
+    return logging.getLogger(name)
@@ -1,36 +1,68 @@
 """
 Security utilities for password hashing, JWT tokens, and API keys
 """
-from passlib.context import CryptContext
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from datetime import timedelta
+from typing import Optional, Dict, Any, Union
 import jwt
+import bcrypt
+import hashlib
+import hmac
+import re
 import secrets
+import time
 import uuid
 
-import os
-from dotenv import load_dotenv
+from .cache import TTLCache
+from ..config_clean import settings
 
-load_dotenv()
+# Password hashing: bcrypt called directly rather than through passlib;
+# 12 rounds matches the cost passlib used, so existing hashes are unchanged
+BCRYPT_ROUNDS = 12
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated=[])
+# bcrypt hashes identify their scheme by prefix
+BCRYPT_PREFIXES = ("$2b$", "$2a$", "$2y$")
 
-# JWT Configuration (should come from settings)
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+# API keys are stored as raw SHA-256 digests
+API_KEY_DIGEST_SIZE = hashlib.sha256().digest_size
+
+# JWT Configuration
+SECRET_KEY = settings.secret_key
+ALGORITHM = settings.algorithm
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+REFRESH_TOKEN_EXPIRE_DAYS = settings.refresh_token_expire_days
+
+# Secret encoded once rather than on every encode/decode
+_JWT_SECRET = SECRET_KEY.encode("utf-8")
+
+# header.payload.signature in base64url; anything else is rejected before
+# hashing, cache lookup or PyJWT parsing
+_JWT_SHAPE = re.compile(r'[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+')
+_JWT_MIN_LENGTH = 20
+
+# Recently verified tokens -> claims, so repeat requests skip signature checks;
+# an entry never outlives the token's own exp
+_verified_tokens = TTLCache(maxsize=20_000, ttl=30)
 
 
 def hash_password(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(BCRYPT_ROUNDS)).decode("utf-8")
+
+
+def _verify_hash(secret: str, hashed: str) -> bool:
+    """Verify a secret against a stored bcrypt hash; anything else never matches"""
+    if not hashed.startswith(BCRYPT_PREFIXES):
+        return False
+    try:
+        return bcrypt.checkpw(secret.encode("utf-8"), hashed.encode("utf-8"))
+    except ValueError:
+        # Malformed hash
+        return False
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _verify_hash(plain_password, hashed_password)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -46,20 +78,19 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     """
     to_encode = data.copy()
     
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # exp/iat as integer epoch seconds, which is what jwt.encode() would
+    # turn datetimes into anyway
+    now = int(time.time())
+    lifetime = expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({
-        "exp": expire,
-        "iat": datetime.utcnow(),
+        "exp": now + int(lifetime.total_seconds()),
+        "iat": now,
         "jti": str(uuid.uuid4()),  # JWT ID for token tracking
         "type": "access"
     })
     
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    return jwt.encode(to_encode, _JWT_SECRET, algorithm=ALGORITHM)
 
 
 def create_refresh_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -75,20 +106,23 @@ def create_refresh_token(data: Dict[str, Any], expires_delta: Optional[timedelta
     """
     to_encode = data.copy()
     
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    # exp/iat as integer epoch seconds, which is what jwt.encode() would
+    # turn datetimes into anyway
+    now = int(time.time())
+    lifetime = expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     
     to_encode.update({
-        "exp": expire,
-        "iat": datetime.utcnow(),
+        "exp": now + int(lifetime.total_seconds()),
+        "iat": now,
         "jti": str(uuid.uuid4()),
         "type": "refresh"
     })
     
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    return jwt.encode(to_encode, _JWT_SECRET, algorithm=ALGORITHM)
+
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
 
 
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
@@ -101,13 +135,29 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
     Returns:
         Decoded token payload or None if invalid
     """
+    if len(token) < _JWT_MIN_LENGTH or not _JWT_SHAPE.fullmatch(token):
+        return None
+    
+    # Keyed by a 16-byte BLAKE2b digest so the cache never holds whole tokens
+    cache_key = _token_cache_key(token)
+    cached = _verified_tokens.get(cache_key)
+    if cached is not None:
+        # Signature and expiry were checked when cached (the entry expires
+        # with the token); revocation is checked against the session by
+        # the caller
+        return cached
+    
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        payload = jwt.decode(token, _JWT_SECRET, algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         return None
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         return None
+    
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        _verified_tokens.set(cache_key, payload, ttl=min(_verified_tokens.ttl, remaining))
+    return payload
 
 
 def generate_random_token(length: int = 32) -> str:
@@ -125,11 +175,21 @@ def generate_api_key() -> str:
     return f"et_{random_part}"
 
 
-def hash_api_key(api_key: str) -> str:
-    """Hash an API key for secure storage"""
-    return pwd_context.hash(api_key)
+def hash_api_key(api_key: str) -> bytes:
+    """
+    Hash an API key for secure storage
+    
+    Keys are 256 bits of randomness, so a plain SHA-256 digest is as strong
+    as an adaptive hash; the raw 32 bytes are stored rather than hex.
+    """
+    return hashlib.sha256(api_key.encode("utf-8")).digest()
 
 
-def verify_api_key(plain_key: str, hashed_key: str) -> bool:
+def verify_api_key(plain_key: str, hashed_key: Union[bytes, str]) -> bool:
     """Verify an API key against its hash"""
-    return pwd_context.verify(plain_key, hashed_key)
+    if isinstance(hashed_key, bytes) and len(hashed_key) == API_KEY_DIGEST_SIZE:
+        return hmac.compare_digest(hash_api_key(plain_key), hashed_key)
+    # Keys created before the switch to SHA-256 still hold a bcrypt hash
+    if isinstance(hashed_key, bytes):
+        hashed_key = hashed_key.decode("utf-8")
+    return _verify_hash(plain_key, hashed_key)
@@ -0,0 +1,75 @@
+"""
+Outbound URL checks for user-supplied destinations (webhooks)
+
+A URL is accepted only if it is http(s) and every address its host resolves
+to is publicly routable, so callers cannot make the server reach loopback,
+private networks, link-local ranges or cloud metadata endpoints.
+"""
+import asyncio
+import ipaddress
+import socket
+from typing import Iterable, Union
+from urllib.parse import urlsplit
+
+
+ALLOWED_SCHEMES = frozenset({"http", "https"})
+
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+class UnsafeURLError(ValueError):
+    """Raised when a URL must not be requested by the server"""
+
+
+def is_public_address(address: IPAddress) -> bool:
+    """Return True if the address is globally routable"""
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped is not None:
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast
+
+
+def _check_addresses(host: str, addresses: Iterable[str]) -> None:
+    for raw in addresses:
+        # Scoped IPv6 results carry a "%iface" suffix
+        address = ipaddress.ip_address(raw.split("%", 1)[0])
+        if not is_public_address(address):
+            raise UnsafeURLError(f"Host {host} resolves to a non-public address ({address})")
+
+
+async def validate_public_url(url: str) -> str:
+    """
+    Check that a URL is http(s) and its host resolves only to public addresses
+
+    Returns the URL unchanged; raises UnsafeURLError otherwise.
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError as e:
+        raise UnsafeURLError(f"Invalid URL: {e}")
+    if parts.scheme.lower() not in ALLOWED_SCHEMES:
+        raise UnsafeURLError("URL scheme must be http or https")
+    host = parts.hostname
+    if not host:
+        raise UnsafeURLError("URL has no host")
+
+    try:
+        literal = ipaddress.ip_address(host)
+    except ValueError:
+        literal = None
+    if literal is not None:
+        _check_addresses(host, [str(literal)])
+        return url
+
+    if port is None:
+        port = 443 if parts.scheme.lower() == "https" else 80
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+    except (socket.gaierror, UnicodeError) as e:
+        raise UnsafeURLError(f"Could not resolve host {host}: {e}")
+    if not infos:
+        raise UnsafeURLError(f"Could not resolve host {host}")
+    _check_addresses(host, (info[4][0] for info in infos))
+    return url
@@ -1,6 +1,6 @@
 # Database models package
 from .user_models import User, UserSession, LoginAttempt, Role, UserRole, UserStatus
-from .security_models import SecurityAuditLog, PasswordResetToken, SecuritySettings
+from .security_models import SecurityAuditLog, PasswordResetToken, SecuritySettings, IpLocation
 from .settings_models import UserSettings
 from .subscription_models import SubscriptionPlan, UserSubscription, FeatureUsageLog
 from .recurring_models import (
@@ -11,6 +11,7 @@ from .recurring_models import (
     WeekDay
 )
 from .api_key_models import ApiKey, ApiKeyUsage
+from .webhook_models import WebhookEvent
 
 __all__ = [
     "User",
@@ -22,6 +23,7 @@ __all__ = [
     "SecurityAuditLog",
     "PasswordResetToken",
     "SecuritySettings",
+    "IpLocation",
     "UserSettings",
     "SubscriptionPlan",
     "UserSubscription",
@@ -33,4 +35,5 @@ __all__ = [
     "WeekDay",
     "ApiKey",
     "ApiKeyUsage",
+    "WebhookEvent",
 ]
@@ -2,7 +2,7 @@
 API Key database model for authentication
 """
 import uuid
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from ..models import Base
@@ -15,7 +15,7 @@ class ApiKey(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     name = Column(String, nullable=False)  # Friendly name for the key
-    key_hash = Column(String, nullable=False)  # Hashed API key
+    key_hash = Column(LargeBinary(32), nullable=False)  # SHA-256 digest of the API key
     key_prefix = Column(String, nullable=False)  # First 8 chars for identification (e.g., "et_12345678")
     
     # Rate limiting
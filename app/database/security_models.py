@@ -132,3 +132,12 @@ class SecuritySettings(Base):
             db_session.add(settings)
             db_session.commit()
         return settings
+
+
+class IpLocation(Base):
+    """Cached IP geolocation results, so lookups survive process restarts"""
+    __tablename__ = "ip_locations"
+    
+    ip_address = Column(String, primary_key=True)
+    location = Column(String, nullable=True)  # None when the service had no answer
+    fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,7 +1,7 @@
 """
 User authentication and management models
 """
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Integer, Text, Enum
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Integer, Text, Enum, Index, func
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 import enum
@@ -63,6 +63,11 @@ class User(Base):
     login_attempts = relationship("LoginAttempt", back_populates="user", cascade="all, delete-orphan")
     user_roles = relationship("UserRole", back_populates="user", cascade="all, delete-orphan")
     
+    # Case-insensitive email lookups (forgot-password, registration checks)
+    __table_args__ = (
+        Index('ix_users_email_lower', func.lower(email), unique=True),
+    )
+    
     def is_locked(self) -> bool:
         """Check if account is currently locked"""
         if self.locked_until is None:
@@ -112,6 +117,11 @@ class UserSession(Base):
     # Relationships
     user = relationship("User", back_populates="sessions")
     
+    # Covers the active-sessions listing: filter by user/active/expiry, order by activity
+    __table_args__ = (
+        Index('ix_user_sessions_user_active_expires', 'user_id', 'is_active', 'expires_at', 'last_activity_at'),
+    )
+    
     def is_expired(self) -> bool:
         """Check if session is expired"""
         return datetime.utcnow() > self.expires_at
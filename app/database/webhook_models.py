@@ -0,0 +1,39 @@
+"""
+Webhook event database model for delivery tracking
+"""
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from ..models import Base
+
+
+class WebhookEvent(Base):
+    """Webhook events queued for delivery and their delivery status"""
+    __tablename__ = "webhook_events"
+    
+    id = Column(String, primary_key=True)  # "webhook_<uuid>"
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    webhook_url = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)
+    payload = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)  # Event data
+    secret = Column(String, nullable=True)  # HMAC signing secret, if requested
+    
+    # Delivery status
+    delivered = Column(Boolean, default=False, nullable=False)
+    delivery_attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    response_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    error_message = Column(Text, nullable=True)
+    claimed_until = Column(DateTime, nullable=True)  # Lease held by the process delivering the event
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_attempt_at = Column(DateTime, nullable=True)
+    delivered_at = Column(DateTime, nullable=True)
+    
+    # Indexes for better performance
+    __table_args__ = (
+        Index('idx_webhook_events_user_created', 'user_id', 'created_at'),
+        Index('idx_webhook_events_delivered', 'delivered'),
+    )
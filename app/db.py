@@ -1,21 +1,20 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from .models import Base
-import os
-from dotenv import load_dotenv
 import logging
 
-# Load environment variables
-load_dotenv()
+from .config_clean import settings
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Database configuration
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./email_tracker.db")
+DATABASE_URL = settings.database_url
 
 # Create engine with proper configuration
 if DATABASE_URL.startswith("sqlite"):
@@ -30,17 +29,45 @@ else:
     if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
     
-    engine = create_engine(DATABASE_URL, echo=False)
+    # Connections are recycled every 30 minutes and pinged on checkout so a
+    # dropped connection is replaced instead of failing the request
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        echo=False
+    )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for hot paths that interleave database and network I/O
+# The driver is swapped on the parsed URL so explicit sync drivers such as
+# postgresql+psycopg2:// or sqlite+pysqlite:// map to their async counterparts
+if DATABASE_URL.startswith("sqlite"):
+    ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="sqlite+aiosqlite")
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+else:
+    ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=settings.async_db_pool_size,
+        max_overflow=settings.async_db_max_overflow,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        echo=False
+    )
+
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 
 def init_db():
     """Initialize the database by creating all tables"""
     try:
         # Import all models to ensure they are registered with Base
-        from .database import user_models, security_models, settings_models, subscription_models, recurring_models
+        from .database import user_models, security_models, settings_models, subscription_models, recurring_models, webhook_models
         
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
@@ -57,6 +84,11 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def drop_db():
     """Drop all database tables"""
     from models import Base
@@ -6,13 +6,13 @@ from email.mime.base import MIMEBase
 from email.utils import formataddr
 from email import encoders
 import re
-import os
 from typing import Optional
 import logging
 from datetime import datetime
 import base64
 import certifi
 
+from .config_clean import settings
 from .models import EmailTracker
 from .email_schemas import EmailSendRequest
 
@@ -22,13 +22,13 @@ logger = logging.getLogger(__name__)
 
 class EmailService:
     def __init__(self):
-        self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        self.smtp_username = os.getenv("SMTP_USERNAME")
-        self.smtp_password = os.getenv("SMTP_PASSWORD")
-        self.base_url = os.getenv("BASE_URL")
+        self.smtp_server = settings.smtp_server
+        self.smtp_port = settings.smtp_port
+        self.smtp_username = settings.smtp_username
+        self.smtp_password = settings.smtp_password
+        self.base_url = settings.base_url
         # SSL verification setting (set to False for development/testing if needed)
-        self.verify_ssl = os.getenv("VERIFY_SSL", "True").lower() == "true"
+        self.verify_ssl = settings.verify_ssl
         
     def create_ssl_context(self):
         """Create SSL context with proper certificate handling"""
@@ -8,7 +8,8 @@ from contextlib import asynccontextmanager
 import logging
 logger = logging.getLogger(__name__)
 
-from .db import SessionLocal, init_db
+from .config_clean import settings
+from .db import SessionLocal, init_db, async_engine
 
 # Import all API routers
 from .api.v1.users import router as users_router
@@ -19,7 +20,10 @@ from .api.v1.campaigns import router as campaigns_router
 from .api.v1.templates import router as templates_router
 from .api.v1.contacts import router as contacts_router
 from .api.v1.analytics import router as analytics_router
-from .api.v1.webhooks import router as webhooks_router
+from .api.v1.webhooks import router as webhooks_router, start_webhooks, stop_webhooks
+from .auth.subscription_auth import wait_for_usage_tracking
+from .core.device_detection import close_geo_client
+from .core.logging_config import setup_logging, stop_logging
 from .api.v1.tracking import router as tracking_router
 from .api.v1.settings import router as settings_router
 from .api.v1.premium import router as premium_router
@@ -30,9 +34,15 @@ init_db()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    setup_logging()
+    await start_webhooks()
     yield
     # Shutdown
-    pass
+    await wait_for_usage_tracking()
+    await stop_webhooks()
+    await close_geo_client()
+    await async_engine.dispose()
+    stop_logging()
 
 app = FastAPI(
     title="EmailTracker API",
@@ -112,12 +122,7 @@ Need help? Contact our support team:
 # CORS middleware - Explicitly configured for production
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "https://mail-tantra.marvonix.com",
-        "https://mail-tantra.marvonix.com/", 
-        "http://localhost:3000",
-        "https://emailtrackerapi.marvonix.com"
-    ],
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -97,16 +97,15 @@ class RecurringScheduleValidator:
         
         # 0. Normalize datetime values first to prevent parsing errors
         try:
-            from ..core.datetime_validators import DateTimeValidatorMixin
-            dt_validator = DateTimeValidatorMixin()
+            from ..core.datetime_validators import normalize_datetime
             
             # Normalize start_date
             if 'start_date' in config and config['start_date']:
-                config['start_date'] = dt_validator.normalize_datetime_fields(config['start_date'])
+                config['start_date'] = normalize_datetime(config['start_date'])
                 
             # Normalize end_date
             if 'end_date' in config and config['end_date']:
-                config['end_date'] = dt_validator.normalize_datetime_fields(config['end_date'])
+                config['end_date'] = normalize_datetime(config['end_date'])
                 
         except Exception as e:
             return {
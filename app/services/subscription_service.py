@@ -2,8 +2,10 @@
 Subscription and feature access service for EmailTracker API
 """
 from typing import Optional, Dict, Any, List
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
+from enum import IntEnum
 
 from ..database.subscription_models import (
     SubscriptionPlan, 
@@ -15,20 +17,43 @@ from ..database.subscription_models import (
 from ..database.user_models import User
 
 
+class PlanLevel(IntEnum):
+    """Subscription tiers, ordered so plans compare as integers"""
+    FREE = 0
+    PRO = 1
+    ENTERPRISE = 2
+    
+    @classmethod
+    def from_name(cls, plan_name: str) -> "PlanLevel":
+        """Level for a plan name such as 'pro'; unknown names rank as free"""
+        return _PLAN_LEVELS_BY_NAME.get(plan_name, cls.FREE)
+
+
+# Keyed by the plan names stored in subscription_plans.name
+_PLAN_LEVELS_BY_NAME: Dict[str, PlanLevel] = {level.name.lower(): level for level in PlanLevel}
+
+
 class FeatureAccessService:
     """Service for checking feature access and subscription limits"""
     
+    # One instance is built per request; slots keep it small
+    __slots__ = ("user_id", "db", "_user_subscription", "_plan", "_plan_level")
+    
     def __init__(self, user_id: str, db_session: Session):
         self.user_id = user_id
         self.db = db_session
         self._user_subscription = None
         self._plan = None
+        self._plan_level = None
     
     @property
     def user_subscription(self) -> Optional[UserSubscription]:
         """Get user's current subscription"""
         if self._user_subscription is None:
-            self._user_subscription = self.db.query(UserSubscription).filter(
+            # The plan is loaded in the same query; every access check needs it
+            self._user_subscription = self.db.query(UserSubscription).options(
+                joinedload(UserSubscription.plan)
+            ).filter(
                 UserSubscription.user_id == self.user_id,
                 UserSubscription.status == 'active'
             ).first()
@@ -46,6 +71,13 @@ class FeatureAccessService:
             self._plan = self.user_subscription.plan
         return self._plan
     
+    @property
+    def plan_level(self) -> PlanLevel:
+        """Numeric tier of the user's plan, resolved once"""
+        if self._plan_level is None:
+            self._plan_level = PlanLevel.from_name(self.get_plan_name())
+        return self._plan_level
+    
     def get_plan_name(self) -> str:
         """Get the current plan name"""
         if self.plan:
@@ -184,33 +216,46 @@ class FeatureAccessService:
         return self.plan.max_contacts if self.plan else 500
     
     # Usage tracking methods
+    def _increment_usage(self, counter, feature_name: str, count: int = 1):
+        """
+        Add to a usage counter and log the usage in one commit
+        
+        The counter is incremented in SQL (SET x = x + n) so concurrent
+        requests cannot overwrite each other's increments.
+        """
+        subscription = self.user_subscription
+        if subscription:
+            self.db.execute(
+                update(UserSubscription)
+                .where(UserSubscription.id == subscription.id)
+                .values({counter: counter + count})
+                .execution_options(synchronize_session=False)
+            )
+            self.db.add(FeatureUsageLog(
+                subscription_id=subscription.id,
+                user_id=self.user_id,
+                feature_name=feature_name,
+                usage_count=count
+            ))
+            # Commit expires the loaded subscription, so the next read
+            # sees the new value
+            self.db.commit()
+    
     def track_campaign_creation(self):
         """Track campaign creation usage"""
-        if self.user_subscription:
-            self.user_subscription.campaigns_used += 1
-            self.db.commit()
-            self._log_usage('campaign_create')
+        self._increment_usage(UserSubscription.campaigns_used, 'campaign_create')
     
     def track_email_sent(self, count: int = 1):
         """Track email sending usage"""
-        if self.user_subscription:
-            self.user_subscription.emails_sent_this_month += count
-            self.db.commit()
-            self._log_usage('email_send', count)
+        self._increment_usage(UserSubscription.emails_sent_this_month, 'email_send', count)
     
     def track_template_creation(self):
         """Track template creation usage"""
-        if self.user_subscription:
-            self.user_subscription.templates_used += 1
-            self.db.commit()
-            self._log_usage('template_create')
+        self._increment_usage(UserSubscription.templates_used, 'template_create')
     
     def track_contact_addition(self, count: int = 1):
         """Track contact addition usage"""
-        if self.user_subscription:
-            self.user_subscription.contacts_count += count
-            self.db.commit()
-            self._log_usage('contact_add', count)
+        self._increment_usage(UserSubscription.contacts_count, 'contact_add', count)
     
     def _log_usage(self, feature_name: str, count: int = 1, metadata: Dict[str, Any] = None):
         """Log feature usage for analytics"""
@@ -0,0 +1,177 @@
+"""
+Redis-backed durable queue for incoming webhook events
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import orjson
+import redis.asyncio as aioredis
+from sqlalchemy import insert, select
+
+from ..db import AsyncSessionLocal
+from ..database.webhook_models import WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookEventQueue:
+    """
+    Buffers webhook events in a Redis list and bulk-inserts them
+
+    Producers LPUSH serialized rows. A background flusher LMOVEs up to
+    ``batch_size`` rows at a time (or whatever arrived within
+    ``flush_interval`` seconds) into this process's processing list, writes
+    them with one INSERT, LREMs them once committed and hands them to
+    ``on_flushed`` for delivery. A batch whose insert fails stays in the
+    processing list and is retried first.
+
+    Each process refreshes a liveness key while it runs. On startup,
+    processing lists whose owner's key has expired (a crashed process) are
+    moved back onto the pending list.
+    """
+
+    PENDING_KEY = "webhook:pending"
+    PROCESSING_KEY_PREFIX = "webhook:processing:"
+    CONSUMER_KEY_PREFIX = "webhook:consumer:"
+    CONSUMER_TTL = 30
+
+    def __init__(
+        self,
+        redis_url: str,
+        on_flushed: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        batch_size: int = 1000,
+        flush_interval: float = 0.05,
+        consumer_name: Optional[str] = None
+    ):
+        self.redis = aioredis.from_url(redis_url)
+        self.on_flushed = on_flushed
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.consumer_name = consumer_name or f"{socket.gethostname()}:{os.getpid()}"
+        self.processing_key = self.PROCESSING_KEY_PREFIX + self.consumer_name
+        self.consumer_key = self.CONSUMER_KEY_PREFIX + self.consumer_name
+        self._heartbeat_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def enqueue(self, *rows: Dict[str, Any]) -> None:
+        """Queue one or more webhook event rows"""
+        if rows:
+            await self.redis.lpush(self.PENDING_KEY, *(orjson.dumps(row) for row in rows))
+
+    async def flush(self) -> int:
+        """Insert up to one batch of pending events; returns the number flushed"""
+        # A batch left over from a failed insert (or a crash) goes first;
+        # some of its rows may already have been committed
+        blobs = await self.redis.lrange(self.processing_key, 0, -1)
+        leftover = bool(blobs)
+        if not leftover:
+            first = await self.redis.lmove(self.PENDING_KEY, self.processing_key, "RIGHT", "LEFT")
+            if first is None:
+                return 0
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for _ in range(self.batch_size - 1):
+                    pipe.lmove(self.PENDING_KEY, self.processing_key, "RIGHT", "LEFT")
+                blobs = [first, *(blob for blob in await pipe.execute() if blob is not None)]
+
+        rows = [orjson.loads(blob) for blob in blobs]
+        for row in rows:
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+            row["claimed_until"] = datetime.fromisoformat(row["claimed_until"])
+
+        rows = await self._insert_rows(rows, skip_existing=leftover)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for blob in blobs:
+                pipe.lrem(self.processing_key, 1, blob)
+            await pipe.execute()
+
+        # Rows committed by an earlier, interrupted flush are not dispatched
+        # here; webhook recovery picks them up once their lease expires
+        if rows:
+            await self.on_flushed(rows)
+        return len(blobs)
+
+    async def recover_orphans(self) -> int:
+        """Move processing lists of consumers that are no longer alive back to pending"""
+        moved = 0
+        async for key in self.redis.scan_iter(match=self.PROCESSING_KEY_PREFIX + "*"):
+            name = key.decode()[len(self.PROCESSING_KEY_PREFIX):]
+            if await self.redis.exists(self.CONSUMER_KEY_PREFIX + name):
+                continue
+            while await self.redis.lmove(key, self.PENDING_KEY, "RIGHT", "RIGHT") is not None:
+                moved += 1
+        if moved:
+            logger.info("Moved %d orphaned webhook events back to the pending queue", moved)
+        return moved
+
+    def start(self) -> None:
+        """Start the background flush loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop, flush what is left and close the connection"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        try:
+            while await self.flush():
+                pass
+            await self.redis.delete(self.consumer_key)
+        except Exception as e:
+            logger.error("Error draining webhook queue on shutdown: %s", e)
+
+        await self.redis.aclose()
+
+    async def _heartbeat(self) -> None:
+        now = time.monotonic()
+        if now - self._heartbeat_at >= self.CONSUMER_TTL / 3:
+            await self.redis.set(self.consumer_key, 1, ex=self.CONSUMER_TTL)
+            self._heartbeat_at = now
+
+    async def _run(self) -> None:
+        try:
+            await self._heartbeat()
+            await self.recover_orphans()
+        except Exception as e:
+            logger.error("Error recovering orphaned webhook events: %s", e)
+
+        while True:
+            try:
+                await self._heartbeat()
+                flushed = await self.flush()
+            except Exception as e:
+                logger.error("Error flushing webhook queue: %s", e)
+                flushed = 0
+
+            # A full batch means more may be waiting; otherwise wait for more to arrive
+            if flushed < self.batch_size:
+                await asyncio.sleep(self.flush_interval)
+
+    @staticmethod
+    async def _insert_rows(rows: List[Dict[str, Any]], skip_existing: bool = False) -> List[Dict[str, Any]]:
+        """Insert rows in one statement; returns the rows actually inserted"""
+        async with AsyncSessionLocal() as db:
+            try:
+                if skip_existing:
+                    existing = set((await db.execute(
+                        select(WebhookEvent.id).where(WebhookEvent.id.in_([row["id"] for row in rows]))
+                    )).scalars())
+                    rows = [row for row in rows if row["id"] not in existing]
+                if rows:
+                    await db.execute(insert(WebhookEvent), rows)
+                    await db.commit()
+                return rows
+            except Exception:
+                await db.rollback()
+                raise
@@ -0,0 +1,50 @@
+"""
+Shared fixtures: the app runs against a throwaway SQLite database
+"""
+import os
+import tempfile
+import uuid
+
+# Settings are read on first use, so the database must be chosen before
+# anything under app/ is imported
+_DB_DIR = tempfile.mkdtemp(prefix="email-tracker-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ.pop("REDIS_URL", None)
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+PASSWORD = "Passw0rd!xyz"
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def login(client, email: str) -> dict:
+    """Log in and return the token response"""
+    response = client.post("/api/v1/users/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.fixture
+def user_email(client):
+    """A freshly registered user"""
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    response = client.post(
+        "/api/v1/users/register",
+        json={"email": email, "password": PASSWORD, "full_name": "Test User"}
+    )
+    assert response.status_code == 201, response.text
+    return email
+
+
+@pytest.fixture
+def auth_headers(client, user_email):
+    tokens = login(client, user_email)
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
@@ -0,0 +1,69 @@
+import pytest
+
+from app.auth.jwt_auth import parse_bearer_token
+from tests.conftest import login
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, user_email):
+    tokens = login(client, user_email)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+
+    assert client.post("/api/v1/users/logout", headers=headers).status_code == 200
+
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+    refresh = client.post("/api/v1/users/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert refresh.status_code == 401
+
+
+def test_logout_accepts_lowercase_scheme(client, user_email):
+    tokens = login(client, user_email)
+    headers = {"Authorization": f"bearer {tokens['access_token']}"}
+
+    assert client.post("/api/v1/users/logout", headers=headers).status_code == 200
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+
+
+@pytest.mark.parametrize("header, token", [
+    ("Bearer abc", "abc"),
+    ("BEARER abc", "abc"),
+    ("Bearer xBearer y", "xBearer y"),
+    ("Basic abc", None),
+    ("Bearer", None),
+    ("Bearer ", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_bearer_token(header, token):
+    assert parse_bearer_token(header) == token
+
+
+def test_logout_leaves_other_sessions_active(client, user_email):
+    first = login(client, user_email)
+    second = login(client, user_email)
+
+    client.post("/api/v1/users/logout", headers={"Authorization": f"Bearer {first['access_token']}"})
+
+    headers = {"Authorization": f"Bearer {second['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+
+
+def test_logout_all_revokes_every_session(client, user_email):
+    first = login(client, user_email)
+    second = login(client, user_email)
+
+    response = client.post(
+        "/api/v1/users/logout-all", headers={"Authorization": f"Bearer {first['access_token']}"}
+    )
+    assert response.status_code == 200
+
+    for tokens in (first, second):
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+
+
+def test_missing_and_invalid_tokens(client):
+    assert client.get("/api/v1/users/me").status_code == 403
+    response = client.get("/api/v1/users/me", headers={"Authorization": "Bearer abc.def.ghi-jkl-mno"})
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
@@ -0,0 +1,49 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.core.datetime_validators import normalize_datetime
+
+
+UTC = timezone.utc
+
+
+# Outputs of the original strptime-based implementation
+@pytest.mark.parametrize("value, expected", [
+    ("2025-08-24T10:00:00Z", datetime(2025, 8, 24, 10, tzinfo=UTC)),
+    ("2025-08-24T10:00:00+02:00", datetime(2025, 8, 24, 8, tzinfo=UTC)),
+    ("2025-08-24T10:00:00", datetime(2025, 8, 24, 10, tzinfo=UTC)),
+    ("2025-08-24", datetime(2025, 8, 24, tzinfo=UTC)),
+    ("  2025-08-24  ", datetime(2025, 8, 24, tzinfo=UTC)),
+    ("2025-08-24 10:30:15", datetime(2025, 8, 24, 10, 30, 15, tzinfo=UTC)),
+    ("2025-08-24 10:30", datetime(2025, 8, 24, 10, 30, tzinfo=UTC)),
+    ("2025-8-4 9:05", datetime(2025, 8, 4, 9, 5, tzinfo=UTC)),
+    ("2025-08-24 10:30:15.5", datetime(2025, 8, 24, 10, 30, 15, 500000, tzinfo=UTC)),
+    ("24/08/2025", datetime(2025, 8, 24, tzinfo=UTC)),
+    ("08/24/2025", datetime(2025, 8, 24, tzinfo=UTC)),
+    ("24-08-2025", datetime(2025, 8, 24, tzinfo=UTC)),
+    ("2025/08/24", datetime(2025, 8, 24, tzinfo=UTC)),
+    ("", None),
+    (None, None),
+    (date(2025, 8, 24), datetime(2025, 8, 24, tzinfo=UTC)),
+    (datetime(2025, 8, 24, 10), datetime(2025, 8, 24, 10, tzinfo=UTC)),
+    (datetime(2025, 8, 24, 12, tzinfo=timezone(timedelta(hours=2))), datetime(2025, 8, 24, 10, tzinfo=UTC)),
+])
+def test_normalize_datetime_matches_previous_outputs(value, expected):
+    result = normalize_datetime(value)
+
+    assert result == expected
+    if result is not None:
+        assert result.utcoffset() == timedelta(0)
+
+
+@pytest.mark.parametrize("value", [
+    "not a date",
+    "2025-13-01",
+    "31/31/2025",
+    "٢٠٢٥-08-24",  # Arabic-Indic digits
+    12,
+])
+def test_normalize_datetime_rejects_invalid_input(value):
+    with pytest.raises(ValueError):
+        normalize_datetime(value)
@@ -0,0 +1,81 @@
+import time
+from datetime import timedelta
+
+import bcrypt
+import jwt
+
+from app.core import security
+from app.core.security import (
+    ALGORITHM, SECRET_KEY, create_access_token, create_refresh_token, decode_token,
+    generate_api_key, hash_api_key, hash_password, verify_api_key, verify_password
+)
+
+
+def test_access_token_round_trip():
+    token = create_access_token({"sub": "user-1", "session_id": "session-1"})
+    payload = decode_token(token)
+
+    assert payload["sub"] == "user-1"
+    assert payload["session_id"] == "session-1"
+    assert payload["type"] == "access"
+    assert payload["jti"]
+    assert isinstance(payload["exp"], int) and isinstance(payload["iat"], int)
+    assert payload["exp"] - payload["iat"] == security.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+def test_tokens_are_standard_jwts():
+    token = create_refresh_token({"sub": "user-1"}, expires_delta=timedelta(days=1))
+
+    assert jwt.get_unverified_header(token) == {"alg": ALGORITHM, "typ": "JWT"}
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert payload["type"] == "refresh"
+    assert payload["exp"] - payload["iat"] == 86400
+
+
+def test_token_signed_by_pyjwt_is_accepted():
+    now = int(time.time())
+    token = jwt.encode({"sub": "user-2", "exp": now + 60, "iat": now}, SECRET_KEY, algorithm=ALGORITHM)
+
+    assert decode_token(token)["sub"] == "user-2"
+
+
+def test_decode_rejects_expired_tampered_and_malformed_tokens():
+    expired = create_access_token({"sub": "user-1"}, expires_delta=timedelta(seconds=-1))
+    token = create_access_token({"sub": "user-1"})
+    header, payload, signature = token.split(".")
+    tampered = ".".join((header, payload, signature[:-2] + ("AA" if signature[-2:] != "AA" else "BB")))
+    foreign = jwt.encode({"sub": "user-1", "exp": int(time.time()) + 60}, "another-secret", algorithm=ALGORITHM)
+
+    assert decode_token(expired) is None
+    assert decode_token(tampered) is None
+    assert decode_token(foreign) is None
+    assert decode_token("not-a-token") is None
+    assert decode_token("") is None
+
+
+def test_password_hash_round_trip():
+    hashed = hash_password("s3cret-pass")
+
+    assert verify_password("s3cret-pass", hashed)
+    assert not verify_password("wrong-pass", hashed)
+    assert not verify_password("s3cret-pass", "not-a-bcrypt-hash")
+
+
+def test_verify_api_key_with_digest_rows():
+    api_key = generate_api_key()
+    stored = hash_api_key(api_key)
+
+    assert len(stored) == 32
+    assert verify_api_key(api_key, stored)
+    assert not verify_api_key(api_key + "x", stored)
+
+
+def test_verify_api_key_with_legacy_bcrypt_rows():
+    api_key = generate_api_key()
+    legacy = bcrypt.hashpw(api_key.encode("utf-8"), bcrypt.gensalt(4)).decode("utf-8")
+
+    # Legacy rows arrive as str before the binary migration and as bytes after it
+    assert verify_api_key(api_key, legacy)
+    assert verify_api_key(api_key, legacy.encode("utf-8"))
+    assert not verify_api_key(api_key + "x", legacy)
+    assert not verify_api_key(api_key, b"\x00" * 31)
@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.api.v1 import users
+from app.database.user_models import Role, UserRole
+from app.db import SessionLocal
+
+
+class _Later(datetime):
+    """datetime whose utcnow() is an hour ahead"""
+
+    @classmethod
+    def utcnow(cls):
+        return datetime.utcnow() + timedelta(hours=1)
+
+
+def test_me_etag_changes_when_a_role_expires(client, auth_headers, monkeypatch):
+    user_id = client.get("/api/v1/users/me", headers=auth_headers).json()["id"]
+    role_id, role_name = str(uuid.uuid4()), f"role-{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        db.add(Role(id=role_id, name=role_name, permissions="[]"))
+        db.add(UserRole(
+            id=str(uuid.uuid4()), user_id=user_id, role_id=role_id,
+            expires_at=datetime.utcnow() + timedelta(minutes=30)
+        ))
+        db.commit()
+
+    first = client.get("/api/v1/users/me", headers=auth_headers)
+    assert [r["name"] for r in first.json()["roles"]] == [role_name]
+    etag = first.headers["etag"]
+    cached = client.get("/api/v1/users/me", headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+
+    monkeypatch.setattr(users, "datetime", _Later)
+    expired = client.get("/api/v1/users/me", headers={**auth_headers, "If-None-Match": etag})
+
+    assert expired.status_code == 200
+    assert expired.json()["roles"] == []
+    assert expired.headers["etag"] != etag
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+
+from app.database.webhook_models import WebhookEvent
+from app.db import SessionLocal
+from app.services.webhook_queue import WebhookEventQueue
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _row(user_id, name):
+    now = datetime.utcnow()
+    return {
+        "id": f"webhook_queue_{user_id}_{name}", "user_id": user_id,
+        "webhook_url": "https://example.com/hook", "event_type": "email.sent",
+        "payload": {"name": name}, "secret": None, "delivered": False,
+        "delivery_attempts": 0, "max_attempts": 5,
+        "claimed_until": now + timedelta(minutes=10), "created_at": now
+    }
+
+
+@pytest.fixture
+def user_id(client, auth_headers):
+    return client.get("/api/v1/users/me", headers=auth_headers).json()["id"]
+
+
+@pytest.fixture
+def queue():
+    flushed = []
+
+    async def on_flushed(rows):
+        flushed.extend(row["id"] for row in rows)
+
+    event_queue = WebhookEventQueue("redis://localhost", on_flushed, consumer_name="test")
+    event_queue.redis = fakeredis.aioredis.FakeRedis()
+    event_queue.flushed = flushed
+    return event_queue
+
+
+def _stored(ids):
+    with SessionLocal() as db:
+        return {event_id for (event_id,) in db.query(WebhookEvent.id).filter(WebhookEvent.id.in_(ids))}
+
+
+async def test_flush_inserts_then_clears_processing_list(queue, user_id):
+    rows = [_row(user_id, "a"), _row(user_id, "b")]
+    await queue.enqueue(*rows)
+
+    assert await queue.flush() == 2
+    assert await queue.redis.llen(queue.processing_key) == 0
+    assert await queue.redis.llen(queue.PENDING_KEY) == 0
+    assert sorted(queue.flushed) == sorted(row["id"] for row in rows)
+    assert _stored([row["id"] for row in rows]) == {row["id"] for row in rows}
+
+
+async def test_failed_insert_keeps_batch_in_processing_list(queue, user_id, monkeypatch):
+    row = _row(user_id, "retry")
+    await queue.enqueue(row)
+
+    async def failing_insert(rows, skip_existing=False):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(queue, "_insert_rows", failing_insert)
+    with pytest.raises(RuntimeError):
+        await queue.flush()
+    assert await queue.redis.llen(queue.processing_key) == 1
+
+    monkeypatch.undo()
+    assert await queue.flush() == 1
+    assert queue.flushed == [row["id"]]
+    assert await queue.redis.llen(queue.processing_key) == 0
+
+
+async def test_leftover_rows_already_committed_are_not_reinserted(queue, user_id):
+    committed, fresh = _row(user_id, "committed"), _row(user_id, "fresh")
+    with SessionLocal() as db:
+        db.add(WebhookEvent(**committed))
+        db.commit()
+    await queue.redis.lpush(queue.processing_key, orjson.dumps(committed), orjson.dumps(fresh))
+
+    assert await queue.flush() == 2
+    assert queue.flushed == [fresh["id"]]
+    assert _stored([committed["id"], fresh["id"]]) == {committed["id"], fresh["id"]}
+
+
+async def test_orphaned_processing_lists_are_requeued(queue, user_id):
+    dead_key = queue.PROCESSING_KEY_PREFIX + "dead"
+    live_key = queue.PROCESSING_KEY_PREFIX + "live"
+    await queue.redis.lpush(dead_key, orjson.dumps(_row(user_id, "orphan")))
+    await queue.redis.lpush(live_key, orjson.dumps(_row(user_id, "in-flight")))
+    await queue.redis.set(queue.CONSUMER_KEY_PREFIX + "live", 1, ex=queue.CONSUMER_TTL)
+
+    assert await queue.recover_orphans() == 1
+    assert await queue.redis.llen(dead_key) == 0
+    assert await queue.redis.llen(live_key) == 1
+    assert await queue.redis.llen(queue.PENDING_KEY) == 1
@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api.v1 import webhooks
+from app.api.v1.webhooks import _claim_pending_deliveries, _decode_cursor, _encode_cursor
+from app.core.url_safety import UnsafeURLError, validate_public_url
+from app.database.webhook_models import WebhookEvent
+from app.db import AsyncSessionLocal, SessionLocal
+
+
+def _add_events(user_id, count, created_at):
+    """Store delivered events; two share each timestamp to exercise the id tie-break"""
+    ids = []
+    with SessionLocal() as db:
+        for i in range(count):
+            event_id = f"webhook_test_{user_id}_{i:02d}"
+            db.add(WebhookEvent(
+                id=event_id, user_id=user_id, webhook_url="https://example.com/hook",
+                event_type="email.sent", payload={"i": i}, delivered=True,
+                delivery_attempts=1, max_attempts=5,
+                created_at=created_at + timedelta(seconds=i // 2)
+            ))
+            ids.append(event_id)
+        db.commit()
+    return ids
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 8, 24, 10, 30, 15, 123456)
+    cursor = _encode_cursor(created_at, "webhook_abc|def")
+
+    assert _decode_cursor(cursor) == (created_at, "webhook_abc|def")
+    with pytest.raises(ValueError):
+        _decode_cursor("!!not-base64!!")
+
+
+def test_event_list_pages_with_cursor(client, auth_headers):
+    user_id = client.get("/api/v1/users/me", headers=auth_headers).json()["id"]
+    ids = _add_events(user_id, 7, datetime(2025, 1, 1))
+    expected = sorted(ids, key=lambda event_id: (int(event_id[-2:]) // 2, event_id), reverse=True)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/webhooks/events", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        seen += [event["event_id"] for event in response.json()]
+        pages += 1
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert seen == expected
+    assert pages == 3
+
+
+def test_event_list_rejects_bad_cursor(client, auth_headers):
+    response = client.get("/api/v1/webhooks/events", params={"cursor": "@@@"}, headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("url", [
+    "ftp://example.com/hook",
+    "http:///hook",
+    "http://127.0.0.1:8000/hook",
+    "http://localhost/hook",
+    "http://10.0.0.5/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://[::1]/hook",
+    "http://[::ffff:192.168.0.1]/hook",
+])
+async def test_internal_webhook_urls_are_rejected(url):
+    with pytest.raises(UnsafeURLError):
+        await validate_public_url(url)
+
+
+async def test_public_address_is_accepted():
+    assert await validate_public_url("https://8.8.8.8/hook") == "https://8.8.8.8/hook"
+
+
+def test_send_rejects_internal_url(client, auth_headers):
+    single = client.post(
+        "/api/v1/webhooks/events/send",
+        params={"webhook_url": "http://127.0.0.1/hook", "event_type": "email.sent"},
+        json={"a": 1},
+        headers=auth_headers
+    )
+    batch = client.post(
+        "/api/v1/webhooks/events/send-batch",
+        json=[{"webhook_url": "http://169.254.169.254/", "event_type": "email.sent", "payload": {}}],
+        headers=auth_headers
+    )
+
+    assert single.status_code == 400
+    assert batch.status_code == 400
+
+
+async def test_pending_events_are_claimed_once(client, auth_headers):
+    user_id = client.get("/api/v1/users/me", headers=auth_headers).json()["id"]
+    now = datetime.utcnow()
+    states = {
+        "fresh": (0, None),
+        "lease_expired": (2, now - timedelta(minutes=1)),
+        "leased": (1, now + timedelta(minutes=5)),
+        "exhausted": (5, None),
+    }
+    with SessionLocal() as db:
+        for name, (attempts, claimed_until) in states.items():
+            db.add(WebhookEvent(
+                id=f"webhook_claim_{user_id}_{name}", user_id=user_id,
+                webhook_url="https://example.com/hook", event_type="email.sent",
+                payload={}, delivered=False, delivery_attempts=attempts,
+                max_attempts=5, claimed_until=claimed_until, created_at=now
+            ))
+        db.commit()
+    prefix = f"webhook_claim_{user_id}_"
+
+    async with AsyncSessionLocal() as db:
+        first = [row.id for row in await _claim_pending_deliveries(db) if row.id.startswith(prefix)]
+        second = [row.id for row in await _claim_pending_deliveries(db) if row.id.startswith(prefix)]
+
+    assert sorted(first) == [prefix + "fresh", prefix + "lease_expired"]
+    assert second == []
+
+
+async def test_batch_only_uses_remaining_attempts(monkeypatch):
+    attempts, recorded = [], []
+
+    async def failing_attempt(client, delivery, attempt):
+        attempts.append(attempt)
+        return {
+            "id": delivery["id"],
+            "delivered": False,
+            "delivery_attempts": delivery["previous_attempts"] + attempt,
+            "claimed_until": datetime.utcnow()
+        }
+
+    async def record(results):
+        recorded.extend(dict(result) for result in results)
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(webhooks, "_attempt_delivery", failing_attempt)
+    monkeypatch.setattr(webhooks, "_record_delivery_attempts", record)
+    monkeypatch.setattr(webhooks.asyncio, "sleep", no_sleep)
+    stored_event = {
+        "id": "webhook_budget", "webhook_url": "https://example.com/hook",
+        "event_type": "email.sent", "payload": {}, "secret": None,
+        "previous_attempts": 3, "max_attempts": 5
+    }
+
+    assert await webhooks.deliver_webhook_batch([stored_event]) == 0
+    assert attempts == [1, 2]
+    assert recorded[-1]["delivery_attempts"] == 5
+    assert recorded[-1]["claimed_until"] is None